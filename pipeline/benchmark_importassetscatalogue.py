@@ -0,0 +1,441 @@
+#!/usr/bin/env python
+"""
+Benchmarks for importassetscatalogue.py
+
+Runs under plain python, no Houdini licence needed. Scanning never touches hou, and imports are run
+against InMemoryAssetGalleryDataSource, an in-memory stand-in for hou.AssetGalleryDataSource.
+
+Usage:
+    python benchmark_importassetscatalogue.py
+    python benchmark_importassetscatalogue.py --suite variants --variant-counts 500,1000,2000,4000
+    python benchmark_importassetscatalogue.py --suite import --asset-counts 1000,10000 --output bench.json
+    python benchmark_importassetscatalogue.py --suite import --baseline bench.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import Counter
+from pathlib import Path
+
+import importassetscatalogue as catalogue
+
+
+def build_variant_asset(root, variant_count):
+    """
+    Create one component-builder asset with variant_count variants. Thumbnail names use a
+    different case to the USD files so case-insensitive matching is exercised.
+    """
+    asset_dir = root / 'kitbash'
+    variants_dir = asset_dir / 'variants'
+    variants_dir.mkdir(parents=True)
+    (asset_dir / 'kitbash.usdc').touch()
+    (asset_dir / 'thumbnail.jpg').touch()
+
+    for i in range(variant_count):
+        (variants_dir / f"kitbash_piece{i:05d}.usdc").touch()
+        (variants_dir / f"KITBASH_PIECE{i:05d}_Thumbnail.JPG").touch()
+
+    return asset_dir
+
+
+class InMemoryAssetGalleryDataSource:
+    """
+    Stand-in for hou.AssetGalleryDataSource that keeps items in memory and counts every call.
+
+    Databases live in DATABASES keyed by path, so reopening a path sees earlier imports. Changes made
+    inside a transaction are only kept if it's committed, like the real thing (items are replaced
+    rather than changed in place, so a shallow copy is enough to roll back).
+    """
+
+    DATABASES = {}
+    calls = Counter()
+    lock = threading.Lock()
+
+    def __init__(self, database_path):
+        self._count('__init__')
+        self.items = self.DATABASES.setdefault(database_path, {})
+        self.next_id = len(self.items) + 1
+        self.backup = None
+        # importassetscatalogue stamps the database file, so it has to exist
+        open(database_path, 'a').close()
+
+    @classmethod
+    def reset(cls):
+        cls.DATABASES.clear()
+        cls.calls.clear()
+
+    def _count(self, name):
+        with self.lock:
+            self.calls[name] += 1
+
+    def isValid(self):
+        self._count('isValid')
+        return True
+
+    def isReadOnly(self):
+        self._count('isReadOnly')
+        return False
+
+    def itemIds(self):
+        self._count('itemIds')
+        return tuple(self.items)
+
+    def filePath(self, item_id):
+        self._count('filePath')
+        return self.items[item_id]['file_path']
+
+    def metadata(self, item_id):
+        self._count('metadata')
+        return dict(self.items[item_id]['metadata'])
+
+    def setMetadata(self, item_id, metadata):
+        self._count('setMetadata')
+        self.items[item_id] = dict(self.items[item_id], metadata=dict(metadata))
+
+    def setThumbnail(self, item_id, thumbnail):
+        self._count('setThumbnail')
+        self.items[item_id] = dict(self.items[item_id], thumbnail=thumbnail)
+
+    def addTag(self, item_id, tag):
+        self._count('addTag')
+        self.items[item_id] = dict(self.items[item_id], tags=self.items[item_id]['tags'] + [tag])
+
+    def addItem(self, label, file_path=None, thumbnail=b'', type_name='asset', blind_data=b'', creation_date=0):
+        self._count('addItem')
+        item_id = str(self.next_id)
+        self.next_id += 1
+        self.items[item_id] = {
+            'label': label,
+            'file_path': file_path,
+            'thumbnail': thumbnail,
+            'type_name': type_name,
+            'blind_data': blind_data,
+            'creation_date': creation_date,
+            'metadata': {},
+            'tags': [],
+        }
+        return item_id
+
+    def markItemsForDeletion(self, item_ids):
+        self._count('markItemsForDeletion')
+        for item_id in item_ids:
+            self.items.pop(item_id, None)
+
+    def startTransaction(self):
+        self._count('startTransaction')
+        self.backup = dict(self.items)
+
+    def endTransaction(self, commit=True):
+        self._count('endTransaction')
+        if not commit and self.backup is not None:
+            self.items.clear()
+            self.items.update(self.backup)
+        self.backup = None
+
+
+@contextlib.contextmanager
+def fake_hou():
+    """
+    Point importassetscatalogue at InMemoryAssetGalleryDataSource instead of hou.
+    """
+    module = types.ModuleType('hou')
+    module.AssetGalleryDataSource = InMemoryAssetGalleryDataSource
+    real_hou = catalogue.hou
+    catalogue.hou = module
+    try:
+        yield
+    finally:
+        catalogue.hou = real_hou
+
+
+# the calls that make up file metadata traffic, on NFS each one is a round trip
+FILESYSTEM_CALLS = ('stat', 'lstat', 'scandir', 'listdir')
+
+
+@contextlib.contextmanager
+def count_filesystem_calls():
+    """
+    Count os.stat/lstat/scandir/listdir calls (pathlib and os.path go through these) made inside
+    the block, yields the Counter.
+    """
+    counts = Counter()
+    lock = threading.Lock()
+    originals = {name: getattr(os, name) for name in FILESYSTEM_CALLS}
+
+    def counting(name, function):
+        def wrapper(*args, **kwargs):
+            with lock:
+                counts[name] += 1
+            return function(*args, **kwargs)
+        return wrapper
+
+    for name, function in originals.items():
+        setattr(os, name, counting(name, function))
+    try:
+        yield counts
+    finally:
+        for name, function in originals.items():
+            setattr(os, name, function)
+
+
+def build_asset_tree(root, asset_count, variants_per_asset=2, thumbnail_ratio=0.5, mixed_case=True):
+    """
+    Create a synthetic component-builder tree of asset_count assets under root.
+
+    Every asset gets variants_per_asset variants. A thumbnail_ratio share of assets (and their
+    variants) get thumbnails, and with mixed_case every other asset uses a different case for its
+    USD and thumbnail file names than its directory, so case-insensitive matching is exercised.
+    Returns the number of files created.
+    """
+    files = 0
+    thumbnail_every = round(1 / thumbnail_ratio) if thumbnail_ratio else 0
+    for i in range(asset_count):
+        name = f"asset_{i:06d}"
+        odd_case = mixed_case and i % 2
+        asset_dir = root / (name.title() if odd_case else name)
+        asset_dir.mkdir()
+        (asset_dir / f"{name.upper() if odd_case else name}.usdc").touch()
+        files += 1
+        has_thumbnail = thumbnail_every and i % thumbnail_every == 0
+        if has_thumbnail:
+            (asset_dir / ('Thumbnail.JPG' if odd_case else 'thumbnail.jpg')).touch()
+            files += 1
+
+        if variants_per_asset:
+            variants_dir = asset_dir / 'variants'
+            variants_dir.mkdir()
+            for v in range(variants_per_asset):
+                variant = f"{name}_v{v:02d}"
+                (variants_dir / f"{variant}.usd").touch()
+                files += 1
+                if has_thumbnail:
+                    (variants_dir / f"{variant.upper() if odd_case else variant}_thumbnail.png").touch()
+                    files += 1
+    return files
+
+
+def benchmark_import(asset_counts, variants_per_asset=2, thumbnail_ratio=0.5, mixed_case=True, workers=None):
+    """
+    Time scan_assets_directory, a fresh import_assets and a re-import (everything already in the
+    database) on synthetic trees of each size, counting filesystem metadata and datasource calls.
+
+    Returns a list of result dicts, one per (assets, phase).
+    """
+    workers = workers or catalogue.DEFAULT_SCAN_WORKERS
+    print(f"Import benchmark ({variants_per_asset} variants per asset, {thumbnail_ratio:.0%} with thumbnails, "
+          f"{'mixed' if mixed_case else 'lower'} case, {workers} scan workers)")
+    print(f"  {'assets':>8} {'phase':<9} {'wall (s)':>9} {'per asset (us)':>15} {'fs calls':>10} "
+          f"{'fs/asset':>9} {'db calls':>10}")
+
+    results = []
+    for asset_count in asset_counts:
+        root = Path(tempfile.mkdtemp(prefix='catalogue_bench_'))
+        try:
+            assets_dir = root / 'assets'
+            assets_dir.mkdir()
+            build_asset_tree(assets_dir, asset_count, variants_per_asset, thumbnail_ratio, mixed_case)
+            database_path = str(root / 'bench.db')
+            InMemoryAssetGalleryDataSource.reset()
+
+            phases = [
+                ('scan', lambda: catalogue.scan_assets_directory(assets_dir, True, workers)),
+                ('import', lambda: catalogue.import_assets(assets_dir, database_path, generate_thumbnails=False,
+                                                           scan_workers=workers, tags=['bench'])),
+                ('reimport', lambda: catalogue.import_assets(assets_dir, database_path, generate_thumbnails=False,
+                                                             scan_workers=workers, tags=['bench'])),
+            ]
+            for phase, run in phases:
+                InMemoryAssetGalleryDataSource.calls.clear()
+                # the importer prints a line per asset, keep the terminal out of the timings
+                with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), fake_hou(), \
+                        count_filesystem_calls() as fs_calls:
+                    start = time.perf_counter()
+                    output = run()
+                    elapsed = time.perf_counter() - start
+
+                if phase == 'scan':
+                    assert len(output) == asset_count
+                elif phase == 'import':
+                    assert output['success'] == asset_count * (1 + variants_per_asset), output
+                else:
+                    assert output['skipped'] == asset_count, output
+
+                result = {
+                    'assets': asset_count,
+                    'phase': phase,
+                    'wall': elapsed,
+                    'filesystem_calls': dict(fs_calls),
+                    'datasource_calls': dict(InMemoryAssetGalleryDataSource.calls),
+                }
+                results.append(result)
+                fs_total = sum(fs_calls.values())
+                db_total = sum(InMemoryAssetGalleryDataSource.calls.values())
+                print(f"  {asset_count:>8} {phase:<9} {elapsed:>9.2f} {elapsed / asset_count * 1e6:>15.1f} "
+                      f"{fs_total:>10} {fs_total / asset_count:>9.2f} {db_total:>10}")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    return results
+
+
+def compare_to_baseline(results, baseline, max_call_increase=0.05, max_slowdown=1.5):
+    """
+    Check results against an earlier run's. Call counts are deterministic, so any growth past
+    max_call_increase is a regression. Wall time depends on the machine, so it gets more slack.
+    Returns True if nothing regressed.
+    """
+    baseline = {(result['assets'], result['phase']): result for result in baseline}
+    ok = True
+    print("Comparison with baseline")
+    for result in results:
+        previous = baseline.get((result['assets'], result['phase']))
+        if not previous:
+            continue
+        label = f"{result['assets']} {result['phase']}"
+        for kind in ('filesystem_calls', 'datasource_calls'):
+            now = sum(result[kind].values())
+            before = sum(previous[kind].values())
+            if now > before * (1 + max_call_increase):
+                print(f"  FAIL: {label} {kind} went from {before} to {now}")
+                ok = False
+        ratio = result['wall'] / previous['wall'] if previous['wall'] else 1.0
+        if ratio > max_slowdown:
+            print(f"  FAIL: {label} wall time went from {previous['wall']:.2f}s to {result['wall']:.2f}s")
+            ok = False
+    print(f"  {'PASS' if ok else 'FAIL'}: {'no regressions' if ok else 'regressions found'}")
+    return ok
+
+
+def benchmark_variant_scaling(variant_counts, repeats=3, max_ratio=3.0):
+    """
+    Time scan_asset_directory on assets with increasing variant counts and check the time per
+    variant stays flat, i.e. variant discovery is linear. Returns True if it is.
+    """
+    print("Variant discovery scaling (case-insensitive)")
+    print(f"  {'variants':>10} {'best (ms)':>12} {'per variant (us)':>18}")
+
+    per_variant = []
+    for count in variant_counts:
+        root = Path(tempfile.mkdtemp(prefix='catalogue_bench_'))
+        try:
+            asset_dir = build_variant_asset(root, count)
+            best = None
+            for _ in range(repeats):
+                start = time.perf_counter()
+                asset_info = catalogue.scan_asset_directory(asset_dir, case_insensitive=True)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+
+            assert len(asset_info.variants) == count
+            assert all(thumbnail is not None for _, thumbnail in asset_info.variants)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+        per_variant.append(best / count)
+        print(f"  {count:>10} {best * 1000:>12.2f} {best / count * 1e6:>18.2f}")
+
+    ratio = per_variant[-1] / per_variant[0]
+    linear = ratio <= max_ratio
+    print(f"  per-variant cost ratio (largest/smallest): {ratio:.2f} (limit {max_ratio})")
+    print(f"  {'PASS' if linear else 'FAIL'}: variant discovery is {'linear' if linear else 'super-linear'}")
+    return linear
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks for importassetscatalogue.py')
+    parser.add_argument(
+        '--suite',
+        choices=['all', 'variants', 'import'],
+        default='all',
+        help='Which benchmarks to run (default: all)'
+    )
+    parser.add_argument(
+        '--variant-counts',
+        type=str,
+        default='250,500,1000,2000,4000',
+        metavar='N1,N2,...',
+        help='Comma-separated variant counts for the variant scaling benchmark'
+    )
+    parser.add_argument(
+        '--max-ratio',
+        type=float,
+        default=3.0,
+        help='Fail if the per-variant cost at the largest count exceeds the smallest by this factor (default: 3.0)'
+    )
+    parser.add_argument(
+        '--asset-counts',
+        type=str,
+        default='1000,10000,100000',
+        metavar='N1,N2,...',
+        help='Comma-separated asset counts for the import benchmark (default: 1000,10000,100000)'
+    )
+    parser.add_argument(
+        '--variants-per-asset',
+        type=int,
+        default=2,
+        help='Variants per synthetic asset (default: 2)'
+    )
+    parser.add_argument(
+        '--thumbnail-ratio',
+        type=float,
+        default=0.5,
+        help='Share of synthetic assets that have thumbnails on disk (default: 0.5)'
+    )
+    parser.add_argument(
+        '--lower-case',
+        action='store_true',
+        help='Use lower case file names only instead of mixing cases'
+    )
+    parser.add_argument(
+        '--scan-workers',
+        type=int,
+        help='Scan workers for the import benchmark (default: the importer\'s default)'
+    )
+    parser.add_argument(
+        '--output',
+        type=str,
+        metavar='PATH',
+        help='Write the import benchmark results as JSON, to use as a later --baseline'
+    )
+    parser.add_argument(
+        '--baseline',
+        type=str,
+        metavar='PATH',
+        help='Fail if call counts or wall times regressed against results written by --output'
+    )
+    parser.add_argument(
+        '--max-slowdown',
+        type=float,
+        default=1.5,
+        help='With --baseline, fail if a wall time grew by more than this factor (default: 1.5)'
+    )
+    args = parser.parse_args()
+
+    ok = True
+    if args.suite in ('all', 'variants'):
+        variant_counts = sorted(int(count) for count in args.variant_counts.split(','))
+        ok = benchmark_variant_scaling(variant_counts, max_ratio=args.max_ratio) and ok
+
+    if args.suite in ('all', 'import'):
+        asset_counts = sorted(int(count) for count in args.asset_counts.split(','))
+        results = benchmark_import(asset_counts, args.variants_per_asset, args.thumbnail_ratio,
+                                   not args.lower_case, args.scan_workers)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+        if args.baseline:
+            with open(args.baseline, 'r') as f:
+                ok = compare_to_baseline(results, json.load(f), max_slowdown=args.max_slowdown) and ok
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
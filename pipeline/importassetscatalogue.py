@@ -32,22 +32,343 @@ Usage:
 
 By default, thumbnail generation and case-insensitive matching are enabled.
 Use --no-generate-thumbnails or --case-sensitive to disable these features.
-"""
-import hou
 
+hou is only loaded once the database is written to or a thumbnail is rendered, so a pre-flight scan
+runs under plain python:
+    python importassetcatalogue.py /path/to/assets /path/to/database.db --dry-run
+"""
 import argparse
+import base64
+import ctypes
+import ctypes.util
+import errno
+import hashlib
+import io
+import json
+import multiprocessing
 import os
+import queue
+import select
+import signal
+import sqlite3
+import struct
+import subprocess
+import sys
+import threading
 import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    from PIL import Image
+except ImportError:
+    # only needed for --normalize-thumbnails
+    Image = None
+
+try:
+    import xxhash
+except ImportError:
+    # --dedupe hashes with blake2b instead, a few times slower
+    xxhash = None
+
+# imported by load_hou() the first time it's needed, so scanning, --dry-run and --help don't pay for
+# hython's startup or take a licence
+hou = None
+
 USD_EXTENSIONS = {'.usd', '.usda', '.usdc'}
 # supported image extensions, probably many will work but limiting it here to what i've tested just to be safe
 THUMBNAIL_EXTENSIONS = {'.jpg', '.png', '.jpeg'}
+# --variant-sets writes a layer per variant selection into <database_path>.variant_layers
+VARIANT_LAYERS_SUFFIX = 'variant_layers'
+# scanning is almost entirely waiting on filesystem metadata (slow on NFS), so use more threads than cores
+DEFAULT_SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# levels of category folders --recursive looks through for asset directories
+DEFAULT_MAX_DEPTH = 6
+# child hython processes started by ThumbnailRenderPool are launched with this flag
+RENDER_WORKER_FLAG = '--render-worker'
+# render workers tag their replies with this so they can be picked out of husk/karma output
+RENDER_RESULT_PREFIX = '@@thumbnail_result '
+# `importassetscatalogue.py merge target.db shard.db ...` combines databases built with --shard
+MERGE_COMMAND = 'merge'
+DEFAULT_THUMBNAIL_CACHE_SIZE_GB = 10
+# --normalize-thumbnails defaults, the gallery pane never shows thumbnails bigger than this
+DEFAULT_THUMBNAIL_MAX_EDGE = 512
+DEFAULT_THUMBNAIL_QUALITY = 85
+# --thumbnail-engine choices: Storm preview, low sample denoised Karma, full Karma, or one of those per asset
+THUMBNAIL_ENGINES = ('preview', 'karma-fast', 'karma', 'auto')
+DEFAULT_THUMBNAIL_ENGINE = 'karma'
+# auto renders assets with up to this many bytes of USD with the engine next to it, see thumbnail_engine_for
+AUTO_THUMBNAIL_ENGINES = ((64 * 1024**2, 'karma'), (512 * 1024**2, 'karma-fast'), (None, 'preview'))
+# seconds a preview render gets when no --thumbnail-time-budget is given
+DEFAULT_PREVIEW_TIME_BUDGET = 10.0
+# how many assets each stage of the import pipeline may run ahead of the next one
+DEFAULT_PIPELINE_QUEUE_SIZE = 64
+# --watch imports once the assets directory has been quiet this long, but never waits longer than the max delay
+DEFAULT_WATCH_DEBOUNCE = 5.0
+DEFAULT_WATCH_MAX_DELAY = 60.0
+DEFAULT_WATCH_POLL_INTERVAL = 10.0
+
+class StageTimings:
+    """
+    Thread-safe record of how long each stage of an import took, for the run report.
+
+    Stages are timed with `with timings.stage('add_item'):`. Passing an asset's timing_key as well
+    adds the time to that asset's total, which is how the slowest assets are found (only the
+    per-asset stages scan, variant_sets, prepare and write do that, the finer stages inside them
+    would count twice).
+    """
+
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.durations = defaultdict(list)  # stage -> [seconds, ...]
+            self.assets = defaultdict(dict)  # asset -> {stage: seconds}
+            self.started_at = time.time()
+            self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name, asset=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, asset)
+
+    def record(self, name, seconds, asset=None):
+        with self.lock:
+            self.durations[name].append(seconds)
+            if asset is not None:
+                asset_stages = self.assets[asset]
+                asset_stages[name] = asset_stages.get(name, 0.0) + seconds
+
+    @staticmethod
+    def percentile(sorted_values, percent):
+        # nearest rank
+        index = max(0, -(-len(sorted_values) * percent // 100) - 1)
+        return sorted_values[min(index, len(sorted_values) - 1)]
+
+    def summary(self, slowest=20):
+        """
+        Per-stage count/total/mean/percentiles/max and the slowest assets, as a JSON-able dict.
+        """
+        with self.lock:
+            durations = {name: sorted(values) for name, values in self.durations.items()}
+            assets = {asset: dict(asset_stages) for asset, asset_stages in self.assets.items()}
+            wall_time = time.perf_counter() - self.started
+
+        stages = {}
+        for name, values in sorted(durations.items()):
+            stage = {
+                'count': len(values),
+                'total': sum(values),
+                'mean': sum(values) / len(values),
+            }
+            for percent in self.PERCENTILES:
+                stage[f'p{percent}'] = self.percentile(values, percent)
+            stage['max'] = values[-1]
+            stages[name] = stage
+
+        slowest_assets = sorted(assets.items(), key=lambda item: sum(item[1].values()), reverse=True)[:slowest]
+        return {
+            'started_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started_at)),
+            'wall_time': wall_time,
+            'stages': stages,
+            'slowest_assets': [
+                {'asset': asset, 'total': sum(asset_stages.values()), 'stages': asset_stages}
+                for asset, asset_stages in slowest_assets
+            ],
+        }
+
+    def write_report(self, path, stats):
+        """
+        Write the summary plus the import stats as JSON.
+        """
+        report = self.summary()
+        report['stats'] = stats
+        try:
+            write_atomic(path, json.dumps(report, indent=2))
+            print(f"Wrote import report: {path}")
+        except OSError as e:
+            print(f"WARNING: Failed to write import report {path}: {e}")
+
+    def write_prometheus(self, path, stats, database_path):
+        """
+        Write the stage totals and import stats in Prometheus text format, for the node exporter's
+        textfile collector (which needs the file replaced atomically).
+        """
+        summary = self.summary()
+        database = os.path.abspath(database_path).replace('\\', '\\\\').replace('"', '\\"')
+        lines = [
+            '# HELP asset_catalogue_import_stage_seconds Total seconds spent in each import stage.',
+            '# TYPE asset_catalogue_import_stage_seconds gauge',
+        ]
+        for name, stage in summary['stages'].items():
+            lines.append(f'asset_catalogue_import_stage_seconds{{database="{database}",stage="{name}"}} {stage["total"]:.6f}')
+        lines += [
+            '# HELP asset_catalogue_import_stage_count Number of times each import stage ran.',
+            '# TYPE asset_catalogue_import_stage_count gauge',
+        ]
+        for name, stage in summary['stages'].items():
+            lines.append(f'asset_catalogue_import_stage_count{{database="{database}",stage="{name}"}} {stage["count"]}')
+        lines += [
+            '# HELP asset_catalogue_import_assets Items by result in the last import.',
+            '# TYPE asset_catalogue_import_assets gauge',
+        ]
+        for result, count in stats.items():
+            if isinstance(count, dict):
+                continue
+            lines.append(f'asset_catalogue_import_assets{{database="{database}",result="{result}"}} {count}')
+        lines += [
+            '# HELP asset_catalogue_import_root_assets Items by assets directory and result in the last import.',
+            '# TYPE asset_catalogue_import_root_assets gauge',
+        ]
+        for root, counts in stats.get('roots', {}).items():
+            root = root.replace('\\', '\\\\').replace('"', '\\"')
+            for result, count in counts.items():
+                lines.append(f'asset_catalogue_import_root_assets{{database="{database}",root="{root}",result="{result}"}} {count}')
+        if 'duplicates' in stats:
+            lines += [
+                '# HELP asset_catalogue_import_duplicate_files Files with the same contents as an earlier file, with --dedupe.',
+                '# TYPE asset_catalogue_import_duplicate_files gauge',
+                f'asset_catalogue_import_duplicate_files{{database="{database}"}} {stats["duplicates"]["files"]}',
+                '# HELP asset_catalogue_import_duplicate_bytes Size of the duplicate files, with --dedupe.',
+                '# TYPE asset_catalogue_import_duplicate_bytes gauge',
+                f'asset_catalogue_import_duplicate_bytes{{database="{database}"}} {stats["duplicates"]["bytes"]}',
+            ]
+        lines += [
+            '# HELP asset_catalogue_import_wall_seconds Wall time of the last import.',
+            '# TYPE asset_catalogue_import_wall_seconds gauge',
+            f'asset_catalogue_import_wall_seconds{{database="{database}"}} {summary["wall_time"]:.6f}',
+            '# HELP asset_catalogue_import_last_run_timestamp_seconds When the last import finished.',
+            '# TYPE asset_catalogue_import_last_run_timestamp_seconds gauge',
+            f'asset_catalogue_import_last_run_timestamp_seconds{{database="{database}"}} {time.time():.0f}',
+        ]
+
+        try:
+            write_atomic(path, '\n'.join(lines) + '\n')
+        except OSError as e:
+            print(f"WARNING: Failed to write Prometheus textfile {path}: {e}")
+
+
+# timings of the current import, module level so deep helpers like load_thumbnail can record into it
+timings = StageTimings()
+
+
+def ordered_map(function, iterable, workers, window=None, thread_name_prefix=''):
+    """
+    Like ThreadPoolExecutor.map, but pulls items from iterable lazily and keeps at most `window`
+    calls in flight, so memory stays flat however long the input is. Results come out in input order.
+    """
+    if workers <= 1:
+        for item in iterable:
+            yield function(item)
+        return
+
+    window = window or workers * 4
+    pending = deque()
+    items = iter(iterable)
+    error = None
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=thread_name_prefix) as executor:
+        try:
+            while True:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    break
+                except Exception as e:
+                    # hand out what's already in flight before passing the error on
+                    error = e
+                    break
+                pending.append(executor.submit(function, item))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+            if error:
+                raise error
+        finally:
+            # consumer stopped early, don't start anything that's still queued
+            for future in pending:
+                future.cancel()
+
+
+def stream_in_background(iterable, maxsize=DEFAULT_PIPELINE_QUEUE_SIZE, name=None):
+    """
+    Run an iterable on its own thread and hand its items over through a bounded queue.
+
+    The producer blocks once maxsize items are waiting, so it can run ahead of the consumer without
+    memory growing. Exceptions raised by the producer are re-raised in the consumer, and closing the
+    returned generator stops the producer.
+    """
+    items = queue.Queue(maxsize)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except BaseException as e:
+            put((done, e))
+        finally:
+            close = getattr(iterable, 'close', None)
+            if close:
+                close()
+
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item, error = items.get()
+            if item is done:
+                if error:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def load_hou():
+    """
+    Import hou on first use. Raises ImportError outside hython.
+    """
+    global hou
+    if hou is None:
+        import hou as hou_module
+        hou = hou_module
+    return hou
+
 
 def create_or_open_database(database_path):
     """
     Create a new asset gallery database or open an existing one.
     """
+    try:
+        load_hou()
+    except ImportError:
+        print("ERROR: hou is not available, writing to an asset gallery database needs hython")
+        return None
+
     try:
         database_path = os.path.abspath(database_path)
 
@@ -74,6 +395,254 @@ def create_or_open_database(database_path):
         return None
 
 
+def format_size(num_bytes):
+    """
+    Human readable byte count, e.g. 1536 -> '1.5 KB'.
+    """
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(num_bytes) < 1024 or unit == 'GB':
+            return f"{num_bytes:.0f} {unit}" if unit == 'B' else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+
+
+def sidecar_path(database_path, suffix):
+    """
+    Path of a file that lives next to the database, e.g. /db/assets.db -> /db/assets.db.manifest.json
+    """
+    return f"{os.path.abspath(database_path)}.{suffix}"
+
+
+def write_atomic(path, data):
+    """
+    Write text or bytes to path through a temp file and a rename, so an interrupted write never
+    leaves a half written file and readers (on other machines too) never see one. The temp file is
+    unique per process and thread. Raises OSError.
+    """
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'wb' if isinstance(data, bytes) else 'w') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def start_process_pool(workers):
+    """
+    ProcessPoolExecutor with all of its workers started now, so the first jobs don't wait on them.
+
+    Workers are spawned rather than forked, forking a process that has hou or pxr (and their
+    thread pools) loaded can deadlock the children.
+    """
+    pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+    list(pool.map(int, range(workers)))
+    return pool
+
+
+class JsonSidecar:
+    """
+    Base for the JSON files kept next to the database (scan manifest, checkpoint, caches).
+
+    Files are stamped with the class's VERSION and the options they were written with, and read()
+    ignores a file from another version or with other options rather than misreading it. Writes go
+    through write_atomic. A sidecar without a path is never read or written.
+    """
+
+    VERSION = 1
+    DESCRIPTION = 'file'  # for messages
+    MISSING_MESSAGE = None  # printed when there's no file yet
+    STALE_MESSAGE = None  # printed when the file is from another version or other options
+
+    def __init__(self, path, options=None):
+        self.path = path
+        self.options = options or {}
+
+    def read(self):
+        """
+        The file's data, or None if it's missing, unreadable or stale.
+        """
+        if not self.path:
+            return None
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            if self.MISSING_MESSAGE:
+                print(f"{self.MISSING_MESSAGE}: {self.path}")
+            return None
+        except (OSError, ValueError) as e:
+            print(f"WARNING: Ignoring unreadable {self.DESCRIPTION} {self.path}: {e}")
+            return None
+
+        if data.get('version') != self.VERSION or data.get('options', {}) != self.options:
+            if self.STALE_MESSAGE:
+                print(f"{self.STALE_MESSAGE}: {self.path}")
+            return None
+        return data
+
+    def write(self, data):
+        """
+        Write data (a dict) with the version and options added.
+        """
+        if not self.path:
+            return
+        try:
+            write_atomic(self.path, json.dumps(dict(data, version=self.VERSION, options=self.options)))
+        except (OSError, TypeError) as e:
+            print(f"WARNING: Failed to write {self.DESCRIPTION} {self.path}: {e}")
+
+
+class ScanManifest(JsonSidecar):
+    """
+    On-disk record of each asset directory's stamp, file list and imported paths.
+
+    Stored as JSON next to the database. On an incremental run, asset directories whose stamp
+    hasn't changed since they were last imported are skipped without being listed. The stamp is
+    the mtime of the asset directory and of its variants/ directory, which changes whenever files
+    are added, removed or renamed (but not when a file is overwritten in place).
+
+    Once existing_paths (the database's current paths) is set, a directory also only counts as
+    unchanged while every path it imported is still in the database, so a run against a rebuilt
+    or replaced database imports them again.
+    """
+
+    VERSION = 1
+    DESCRIPTION = 'scan manifest'
+    MISSING_MESSAGE = 'No scan manifest found, scanning everything'
+    STALE_MESSAGE = 'Scan manifest was written with different options, scanning everything'
+
+    def __init__(self, path, options=None):
+        super().__init__(path, options)
+        self.existing_paths = None
+        self.entries = {}  # asset directory -> {'stamp': [...], 'files': [...], 'imported': [...]}
+        # the scanner and the database writer update the manifest from different threads
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path, options=None):
+        """
+        Load a manifest, or start an empty one if it's missing, unreadable or was written with
+        different import options.
+        """
+        manifest = cls(path, options)
+        data = manifest.read()
+        if data is None:
+            return manifest
+
+        manifest.entries = data.get('entries', {})
+        print(f"Loaded scan manifest with {len(manifest.entries)} directories: {path}")
+        return manifest
+
+    @staticmethod
+    def directory_stamp(asset_dir):
+        """
+        Cheap change stamp for an asset directory, costs one stat (two if it has variants).
+        """
+        stamp = [os.stat(asset_dir).st_mtime_ns]
+        try:
+            stamp.append(os.stat(os.path.join(asset_dir, 'variants')).st_mtime_ns)
+        except OSError:
+            stamp.append(None)
+        return stamp
+
+    @staticmethod
+    def scan_options(import_variants, case_insensitive, max_depth=1):
+        """
+        Options a manifest is only valid for. max_depth is left out of flat scans so manifests
+        written before --recursive existed still match.
+        """
+        options = {'import_variants': import_variants, 'case_insensitive': case_insensitive}
+        if max_depth > 1:
+            options['max_depth'] = max_depth
+        return options
+
+    def is_unchanged(self, asset_dir, stamp):
+        entry = self.entries.get(str(asset_dir))
+        if entry is None or entry['stamp'] != stamp:
+            return False
+        if self.existing_paths is None:
+            return True
+        return all(path in self.existing_paths for path in entry.get('imported', ()))
+
+    def record(self, asset_dir, stamp, files=(), imported=()):
+        entry = {
+            'stamp': stamp,
+            'files': [str(file) for file in files],
+            'imported': list(imported),
+        }
+        with self.lock:
+            self.entries[str(asset_dir)] = entry
+
+    def forget(self, asset_dir):
+        with self.lock:
+            self.entries.pop(str(asset_dir), None)
+
+    def retain(self, assets_dir, asset_dirs):
+        """
+        Drop entries for directories under assets_dir that weren't seen in this scan.
+        """
+        prefix = os.path.join(str(assets_dir), '')
+        keep = {str(asset_dir) for asset_dir in asset_dirs}
+        with self.lock:
+            for key in list(self.entries):
+                if key.startswith(prefix) and key not in keep:
+                    del self.entries[key]
+
+    def save(self):
+        with self.lock:
+            self.write({'entries': self.entries})
+
+
+class ImportCheckpoint(JsonSidecar):
+    """
+    Record of the last asset committed from each assets directory by an import that commits in
+    batches, stored as JSON next to the database. If the import is interrupted, the next run with the
+    same assets directories and options resumes each one after that asset. The checkpoint is removed
+    once an import finishes.
+    """
+
+    VERSION = 2
+    DESCRIPTION = 'import checkpoint'
+    STALE_MESSAGE = 'Ignoring import checkpoint from a run with different options'
+
+    def __init__(self, path, options=None):
+        super().__init__(path, options)
+        self.last_committed = {}  # assets directory -> relative path of its last committed asset directory
+
+    @classmethod
+    def load(cls, path, options=None):
+        checkpoint = cls(path, options)
+        data = checkpoint.read()
+        if data is None:
+            return checkpoint
+
+        checkpoint.last_committed = data.get('last_committed') or {}
+        for root, name in checkpoint.last_committed.items():
+            print(f"Resuming interrupted import of {root} after '{name}' "
+                  f"(checkpoint from {data.get('saved_at', 'unknown time')})")
+        return checkpoint
+
+    def save(self, last_committed):
+        self.last_committed = dict(last_committed)
+        self.write({
+            'last_committed': last_committed,
+            'saved_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        })
+
+    def clear(self):
+        self.last_committed = {}
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"WARNING: Failed to remove import checkpoint {self.path}: {e}")
+
+
 class AssetInfo:
     """Container for asset information following Houdini's component builder structure."""
 
@@ -83,500 +652,3504 @@ class AssetInfo:
         self.thumbnail = thumbnail
         self.variants = variants or []  # list of (variant_file, variant_thumbnail) tuples
         self.name = directory.name
+        self.stamp = None  # directory stamp recorded by the scan manifest, see ScanManifest
+        self.root = None  # assets directory it was found under, see iter_asset_roots
+        self.relative_path = self.name  # path relative to root, with / separators
+        self.categories = []  # folders between root and the asset directory, see discover_asset_directories
+        self.duplicates = {}  # str(usd_file) -> earlier file with the same contents, see ContentHashIndex
+        self.resolved_paths = {}  # str(usd_file) -> resolved path, filled in by the scan, see resolved_path
+        self.variant_selections = {}  # str(layer path) -> variant set and variant, see VariantSetLayers
+
+    def resolved_path(self, usd_file):
+        """
+        Resolved absolute path of one of the asset's USD files, as stored in the database. Worked
+        out once by the scan, so later stages don't walk the path again.
+        """
+        resolved = self.resolved_paths.get(str(usd_file))
+        if resolved is None:
+            resolved = self.resolved_paths[str(usd_file)] = str(Path(usd_file).resolve())
+        return resolved
+
+    @property
+    def resolved_primary(self):
+        return self.resolved_path(self.primary_file)
+
+    @property
+    def timing_key(self):
+        """
+        Name the asset's stages are recorded under in StageTimings, unique across roots and
+        category folders (two assets called chair are two entries).
+        """
+        if self.root is None:
+            return str(self.directory)
+        return f"{self.root}/{self.relative_path}"
+
+    def file_paths(self):
+        """All files that make up this asset (primary, thumbnails and variants)."""
+        files = [self.primary_file]
+        if self.thumbnail:
+            files.append(self.thumbnail)
+        for variant_file, variant_thumbnail in self.variants:
+            files.append(variant_file)
+            if variant_thumbnail:
+                files.append(variant_thumbnail)
+        return files
 
     def __repr__(self):
         variant_count = len(self.variants)
         return f"AssetInfo('{self.name}', primary={self.primary_file.name}, variants={variant_count})"
 
 
-def find_thumbnail(directory, base_name='thumbnail', case_insensitive=False):
+class DirectoryIndex:
+    """
+    Listing of a single directory, read once with os.scandir.
+
+    Matching against the index is a dict lookup, so checking every extension costs no extra
+    exists()/is_file() round trips (which is what hurts on network storage).
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.files = {}  # file name -> Path
+        self.folded_files = {}  # casefolded file name -> Path
+        self.subdirs = set()
+        self.symlinks = set()  # names of files and subdirs that are symlinks
+
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                # DirEntry caches the type from the listing, only symlinks need an extra stat
+                if entry.is_file():
+                    self.files[entry.name] = self.directory / entry.name
+                elif entry.is_dir():
+                    self.subdirs.add(entry.name)
+                else:
+                    continue
+                if entry.is_symlink():
+                    self.symlinks.add(entry.name)
+
+        # sorted so the same file wins every time if names only differ by case
+        for name in sorted(self.files):
+            self.folded_files.setdefault(name.casefold(), self.files[name])
+
+    def resolve(self, name, resolved_directory):
+        """
+        Resolved path of an entry, given the directory's own resolved path. Only symlinks cost a
+        walk of the path, anything else is just joined onto resolved_directory.
+        """
+        if name in self.symlinks:
+            return os.path.realpath(self.directory / name)
+        return os.path.join(resolved_directory, name)
+
+    def find(self, base_name, extensions, case_insensitive=False):
+        """
+        Find a file named base_name with one of the given extensions, exact matches first.
+        """
+        for ext in sorted(extensions):
+            match = self.files.get(f"{base_name}{ext}")
+            if match:
+                return match
+
+        if case_insensitive:
+            for ext in sorted(extensions):
+                match = self.folded_files.get(f"{base_name}{ext}".casefold())
+                if match:
+                    return match
+
+        return None
+
+
+def find_thumbnail(directory, base_name='thumbnail', case_insensitive=False, index=None):
     """
     Find a thumbnail file in the directory.
+
+    Pass an existing DirectoryIndex for the directory to avoid listing it again.
+    """
+    if index is None:
+        try:
+            index = DirectoryIndex(directory)
+        except OSError:
+            return None
+
+    return index.find(base_name, THUMBNAIL_EXTENSIONS, case_insensitive)
+
+
+def pair_variant_files(variants_index, case_insensitive=False):
+    """
+    Pair each variant USD file in a variants/ directory with its <variant>_thumbnail image.
+
+    Thumbnails are bucketed by variant name in one pass over the listing, so this stays linear
+    in the number of files rather than doing a thumbnail search per variant. Matching follows
+    find_thumbnail: an exact-case name wins over a case-insensitive one.
     """
-    # Try exact match first
-    for ext in THUMBNAIL_EXTENSIONS:
-        thumbnail_path = directory / f"{base_name}{ext}"
-        if thumbnail_path.exists() and thumbnail_path.is_file():
-            return thumbnail_path
+    suffix = '_thumbnail'
+    extension_rank = {ext: rank for rank, ext in enumerate(sorted(THUMBNAIL_EXTENSIONS))}
+
+    exact_thumbnails = {}  # variant name -> (rank, thumbnail path)
+    folded_thumbnails = {}  # casefolded variant name -> (rank, file name, thumbnail path)
+    usd_files = []
+
+    for name, file in variants_index.files.items():
+        if file.suffix in USD_EXTENSIONS:
+            usd_files.append(file)
+            continue
+
+        if file.suffix in THUMBNAIL_EXTENSIONS and file.stem.endswith(suffix):
+            candidate = (extension_rank[file.suffix], file)
+            base_name = file.stem[:-len(suffix)]
+            if base_name not in exact_thumbnails or candidate < exact_thumbnails[base_name]:
+                exact_thumbnails[base_name] = candidate
 
-    # If not found and case-insensitive mode, search manually
-    if case_insensitive:
-        target_names = {f"{base_name}{ext}".lower() for ext in THUMBNAIL_EXTENSIONS}
-        for file in directory.iterdir():
-            if file.is_file() and file.name.lower() in target_names:
-                return file
+        if case_insensitive:
+            folded_ext = file.suffix.casefold()
+            folded_stem = file.stem.casefold()
+            if folded_ext in extension_rank and folded_stem.endswith(suffix):
+                candidate = (extension_rank[folded_ext], name, file)
+                base_name = folded_stem[:-len(suffix)]
+                if base_name not in folded_thumbnails or candidate < folded_thumbnails[base_name]:
+                    folded_thumbnails[base_name] = candidate
 
-    return None
+    variants = []
+    for variant_file in sorted(usd_files):
+        variant_name = variant_file.stem
+        variant_thumbnail = None
+        if variant_name in exact_thumbnails:
+            variant_thumbnail = exact_thumbnails[variant_name][-1]
+        elif case_insensitive and variant_name.casefold() in folded_thumbnails:
+            variant_thumbnail = folded_thumbnails[variant_name.casefold()][-1]
+        variants.append((variant_file, variant_thumbnail))
+
+    return variants
 
 
-def scan_asset_directory(asset_dir, case_insensitive=False):
+def scan_asset_directory(asset_dir, case_insensitive=False, index=None):
     """
     Scan a single asset directory following Houdini's component builder structure.
+
+    The asset directory (and its variants/ subdirectory, if any) is listed exactly once, or not at
+    all if its DirectoryIndex is passed in.
     """
-    if not asset_dir.is_dir():
-        return None
+    if index is None:
+        try:
+            index = DirectoryIndex(asset_dir)
+        except OSError:
+            # not a directory, or it disappeared/isn't readable
+            return None
 
     asset_name = asset_dir.name
 
     # Look for primary USD file matching directory name
-    primary_file = None
-    for ext in USD_EXTENSIONS:
-        candidate = asset_dir / f"{asset_name}{ext}"
-        if candidate.exists() and candidate.is_file():
-            primary_file = candidate
-            break
-
-    # handle case-insensitive case
-    if not primary_file and case_insensitive:
-        target_names = {f"{asset_name}{ext}".lower() for ext in USD_EXTENSIONS}
-        for file in asset_dir.iterdir():
-            if file.is_file() and file.name.lower() in target_names:
-                primary_file = file
-                break
-
+    primary_file = index.find(asset_name, USD_EXTENSIONS, case_insensitive)
     if not primary_file:
         return None
 
-    thumbnail = find_thumbnail(asset_dir, 'thumbnail', case_insensitive)
+    thumbnail = find_thumbnail(asset_dir, 'thumbnail', case_insensitive, index=index)
+
+    # resolve the directory once, files in it are joined onto it (see DirectoryIndex.resolve)
+    resolved_dir = os.path.realpath(asset_dir)
+    resolved_paths = {str(primary_file): index.resolve(primary_file.name, resolved_dir)}
 
     # look for variants subdirectory
     variants = []
-    variants_dir = asset_dir / 'variants'
-    if variants_dir.exists() and variants_dir.is_dir():
-        for variant_file in variants_dir.iterdir():
-            if variant_file.is_file() and variant_file.suffix in USD_EXTENSIONS:
-                variant_name = variant_file.stem
-                variant_thumbnail = find_thumbnail(variants_dir, f"{variant_name}_thumbnail", case_insensitive)
-                variants.append((variant_file, variant_thumbnail))
-
-    return AssetInfo(
+    if 'variants' in index.subdirs:
+        variants_dir = asset_dir / 'variants'
+        try:
+            variants_index = DirectoryIndex(variants_dir)
+        except OSError as e:
+            print(f"WARNING: Failed to read variants directory {variants_dir}: {e}")
+            variants_index = None
+
+        if variants_index:
+            variants = pair_variant_files(variants_index, case_insensitive)
+            resolved_variants_dir = index.resolve('variants', resolved_dir)
+            for variant_file, _ in variants:
+                resolved_paths[str(variant_file)] = variants_index.resolve(variant_file.name, resolved_variants_dir)
+
+    asset_info = AssetInfo(
         directory=asset_dir,
         primary_file=primary_file,
         thumbnail=thumbnail,
         variants=variants
     )
+    asset_info.resolved_paths = resolved_paths
+    return asset_info
 
 
-def scan_assets_directory(assets_dir, case_insensitive=False):
+def discover_asset_directories(assets_dir, max_depth, case_insensitive=False, workers=DEFAULT_SCAN_WORKERS,
+                               manifest=None):
     """
-    Scan a directory for assets following Houdini's component builder structure.
+    Walk assets_dir for asset directories nested in category folders (props/furniture/chair/...),
+    up to max_depth levels down, 1 being only the direct children.
+
+    A folder holding a USD file named after itself is an asset and isn't walked any further, any
+    other folder is a category whose subfolders are walked next. The walk goes one level at a time,
+    with every folder in a level listed in parallel on `workers` threads. Hidden and variants/
+    folders are pruned, and folders the ScanManifest reports as unchanged assets aren't even listed.
+
+    Returns (asset directories sorted by path relative to assets_dir, {asset directory: (stamp, index)})
+    so the scan doesn't stat or list them again. The stamp is taken before listing and is None without
+    a manifest, the DirectoryIndex is None for unchanged asset directories.
+    """
+    assets_dir = Path(assets_dir)
+
+    def walkable(name):
+        return not name.startswith('.') and name != 'variants'
+
+    def visit(directory):
+        stamp = None
+        if manifest:
+            try:
+                stamp = manifest.directory_stamp(directory)
+            except OSError:
+                return (None, directory, None)
+            if manifest.is_unchanged(directory, stamp):
+                return ('asset', directory, (stamp, None))
+        try:
+            index = DirectoryIndex(directory)
+        except OSError:
+            # disappeared or isn't readable
+            return (None, directory, None)
+        if index.find(directory.name, USD_EXTENSIONS, case_insensitive):
+            return ('asset', directory, (stamp, index))
+        return ('category', directory, index.subdirs)
+
+    with os.scandir(assets_dir) as entries:
+        level = sorted(Path(entry.path) for entry in entries if entry.is_dir() and walkable(entry.name))
+
+    asset_dirs = []
+    listed = {}
+    depth = 1
+    while level:
+        next_level = []
+        for kind, directory, payload in ordered_map(visit, level, max(1, min(workers, len(level))),
+                                                    thread_name_prefix='asset_walk'):
+            if kind == 'asset':
+                asset_dirs.append(directory)
+                listed[directory] = payload
+            elif kind == 'category' and depth < max_depth:
+                next_level += [directory / name for name in sorted(payload) if walkable(name)]
+        level = next_level
+        depth += 1
+
+    asset_dirs.sort(key=lambda item: item.relative_to(assets_dir).as_posix())
+    return asset_dirs, listed
+
+
+def shard_of(relative_path, count):
+    """
+    Which of count shards an asset belongs to, from a stable hash of its path relative to its assets
+    directory, so every machine partitions a library the same way wherever it's mounted.
+    """
+    digest = hashlib.blake2b(relative_path.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count
+
+
+def iter_assets_directory(assets_dir, case_insensitive=False, workers=DEFAULT_SCAN_WORKERS, manifest=None,
+                          start_after=None, shard=None, max_depth=1):
+    """
+    Scan a directory for assets following Houdini's component builder structure, yielding each
+    AssetInfo (in order of its path relative to assets_dir) as soon as it's scanned.
+
+    With max_depth over 1, asset directories are found at any level down to max_depth by
+    discover_asset_directories, and each AssetInfo gets the folders above it as its categories.
+
+    Asset directories are scanned concurrently on a bounded thread pool of `workers` threads,
+    since each one costs several filesystem round trips. Use workers=1 to scan serially.
+
+    If a ScanManifest is given, directories it reports as unchanged are skipped, and directories
+    that turn out not to be assets are recorded in it.
+
+    start_after skips every asset directory whose relative path sorts at or before it (see ImportCheckpoint).
+
+    shard is (index, count), only asset directories in that shard are scanned (see shard_of).
     """
     assets_dir = Path(assets_dir)
 
     if not assets_dir.exists():
         print(f"ERROR: Assets directory does not exist: {assets_dir}")
-        return []
+        return
 
     if not assets_dir.is_dir():
         print(f"ERROR: Path is not a directory: {assets_dir}")
-        return []
+        return
+
+    def relative_path(item):
+        return item.relative_to(assets_dir).as_posix()
+
+    listed = {}
+    if max_depth > 1:
+        subdirs, listed = discover_asset_directories(assets_dir, max_depth, case_insensitive, workers, manifest)
+    else:
+        # scandir gives us the file type from the directory listing, so no extra stat per child here
+        with os.scandir(assets_dir) as entries:
+            subdirs = [Path(entry.path) for entry in entries if entry.is_dir()]
 
-    assets = []
+        subdirs.sort(key=lambda item: item.name) # sorting so process order is consistent, its not necessary.
 
-    # scan each subdirectory in the assets directory
-    for item in assets_dir.iterdir():
-        if item.is_dir():
-            asset_info = scan_asset_directory(item, case_insensitive)
-            if asset_info:
-                assets.append(asset_info)
+    to_scan = subdirs
+    if start_after is not None:
+        to_scan = [item for item in subdirs if relative_path(item) > start_after]
+        print(f"Skipping {len(subdirs) - len(to_scan)} asset directories in {assets_dir} committed by the interrupted run")
 
-    assets.sort(key=lambda a: a.name) # sorting so process order is consistent, its not necessary.
+    if shard:
+        index, count = shard
+        in_shard = [item for item in to_scan if shard_of(relative_path(item), count) == index]
+        print(f"Shard {index}/{count}: scanning {len(in_shard)} of {len(to_scan)} asset directories in {assets_dir}")
+        to_scan = in_shard
 
-    print(f"Found {len(assets)} valid asset directories in {assets_dir}")
+    def scan_item(item):
+        # the recursive walk already stamped and listed it
+        stamp, index = listed.pop(item, (None, None))
+        if manifest:
+            if stamp is None:
+                try:
+                    stamp = manifest.directory_stamp(item)
+                except OSError:
+                    return (item, None, None)
+            if manifest.is_unchanged(item, stamp):
+                return (item, stamp, 'unchanged')
+
+        relative = relative_path(item)
+        # the same key as AssetInfo.timing_key, root isn't set on it until iter_asset_roots
+        with timings.stage('scan', f"{assets_dir}/{relative}"):
+            asset_info = scan_asset_directory(item, case_insensitive, index)
+        if asset_info:
+            asset_info.stamp = stamp
+            asset_info.relative_path = relative
+            asset_info.categories = relative.split('/')[:-1]
+        return (item, stamp, asset_info)
+
+    found = 0
+    total_variants = 0
+    unchanged = 0
+    workers = max(1, min(workers or 1, len(to_scan)))
+    for item, stamp, asset_info in ordered_map(scan_item, to_scan, workers, thread_name_prefix='asset_scan'):
+        if asset_info == 'unchanged':
+            unchanged += 1
+        elif asset_info:
+            found += 1
+            total_variants += len(asset_info.variants)
+            yield asset_info
+        elif manifest and stamp:
+            # not an asset, nothing to import until the directory changes
+            manifest.record(item, stamp)
+
+    if manifest:
+        manifest.retain(assets_dir, subdirs)
+        if unchanged:
+            print(f"Skipped {unchanged} unchanged asset directories (scan manifest)")
+
+    print(f"Found {found} valid asset directories in {assets_dir}")
 
     # print out summary
-    total_variants = sum(len(a.variants) for a in assets)
     if total_variants > 0:
         print(f"  Including {total_variants} variant(s)")
 
-    return assets
 
+def asset_roots(assets_dir):
+    """
+    assets_dir as a list of absolute roots, it can be one path or a list of them.
+    """
+    if isinstance(assets_dir, (str, os.PathLike)):
+        assets_dir = [assets_dir]
+    return [os.path.abspath(root) for root in assets_dir]
 
-def get_existing_asset_paths(datasource):
+
+def iter_asset_roots(assets_dirs, case_insensitive=False, workers=DEFAULT_SCAN_WORKERS, manifest=None,
+                     start_after=None, shard=None, max_depth=1):
     """
-    Get a set of file paths for all existing assets in the database.
+    Scan several assets directories at once, yielding their AssetInfos with asset_info.root set.
+
+    Each root is scanned by iter_assets_directory on its own thread (with its own pool of `workers`
+    threads, roots are usually separate volumes), and results are taken from each root in turn, so
+    the order is the same every run. An asset reachable from more than one root (same resolved
+    primary file, e.g. a volume mounted twice or a symlinked library) is only yielded the first time.
+
+    start_after maps root -> relative path to skip up to, see ImportCheckpoint. shard and max_depth
+    are passed on to iter_assets_directory.
     """
-    existing_paths = set()
+    roots = asset_roots(assets_dirs)
+    start_after = start_after or {}
+
+    if len(roots) == 1:
+        streams = [(roots[0], iter_assets_directory(roots[0], case_insensitive, workers, manifest,
+                                                    start_after.get(roots[0]), shard, max_depth))]
+    else:
+        streams = [
+            (root, stream_in_background(
+                iter_assets_directory(root, case_insensitive, workers, manifest, start_after.get(root), shard,
+                                      max_depth),
+                name=f'asset_scanner_{i}'
+            ))
+            for i, root in enumerate(roots)
+        ]
 
+    seen = {}  # resolved primary file -> root it was first found under
+    active = list(streams)
     try:
-        item_ids = datasource.itemIds()
+        while active:
+            for stream in list(active):
+                root, assets = stream
+                try:
+                    asset_info = next(assets)
+                except StopIteration:
+                    active.remove(stream)
+                    continue
 
-        for item_id in item_ids:
-            file_path = datasource.filePath(item_id)
-            if file_path:
-                abs_path = os.path.abspath(file_path)
-                existing_paths.add(abs_path)
+                # resolving costs a stat per path component, and can't find anything with one root
+                if len(streams) > 1:
+                    primary_path = asset_info.resolved_primary
+                    if primary_path in seen:
+                        print(f"  Skipping {asset_info.directory}, already found under {seen[primary_path]}")
+                        continue
+                    seen[primary_path] = root
+                asset_info.root = root
+                yield asset_info
+    finally:
+        for _, assets in streams:
+            assets.close()
 
-    except Exception as e:
-        print(f"WARNING: Error reading existing assets: {e}")
 
-    return existing_paths
+def scan_assets_directory(assets_dir, case_insensitive=False, workers=DEFAULT_SCAN_WORKERS, manifest=None):
+    """
+    Scan a directory for assets following Houdini's component builder structure.
+
+    Returns the list of AssetInfo sorted by name, see iter_assets_directory.
+    """
+    return list(iter_assets_directory(assets_dir, case_insensitive, workers, manifest))
 
 
-def load_thumbnail(thumbnail_path, generate_if_missing=False, usd_file_path=None):
+def database_stamp(database_path):
     """
-    Load thumbnail image data from a file, optionally generating it if missing.
+    Change stamp for a SQLite database file, including its write-ahead log if it has one.
     """
-    # try to load existing thumbnail
-    if thumbnail_path and thumbnail_path.exists():
+    stamp = []
+    for path in (database_path, f"{database_path}-wal"):
         try:
-            with open(thumbnail_path, 'rb') as f:
-                return f.read()
-        except Exception as e:
-            print(f"WARNING: Failed to load thumbnail {thumbnail_path}: {e}")
-
-    # generate thumbnail otherwise
-    if generate_if_missing and usd_file_path:
-        return generate_thumbnail_from_usd(usd_file_path)
-
-    return b''
+            stat = os.stat(path)
+            stamp += [stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            stamp += [None, None]
+    return stamp
 
 
-def generate_thumbnail_from_usd(usd_file_path, resolution=(512, 512)):
+def read_gallery_paths_sqlite(database_path):
     """
-    Generate a thumbnail image by rendering a USD file in Houdini.
-    """
-    import tempfile
-    import math
+    Read (item id, file path) for every item in one query against the gallery's SQLite file, opened
+    read-only.
 
-    # create temporary output file
-    with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp:
-        temp_image_path = tmp.name
+    The asset gallery schema isn't documented, so this looks for a table with an id column and a
+    file path column. Returns None if it can't find one or the file can't be read.
+    """
+    path_columns = ('file_path', 'filepath', 'path')
+    id_columns = ('id', 'item_id', 'uuid')
 
-    # need these here to destroy temp nodes
-    stage_net = None
-    reference_sops = None
+    try:
+        uri = f"{Path(os.path.abspath(database_path)).as_uri()}?mode=ro"
+        connection = sqlite3.connect(uri, uri=True)
+    except sqlite3.Error:
+        return None
 
     try:
-        # create lopnet stage to render out thumbnail
-        stage_net = hou.node(f"/obj").createNode("lopnet", f"temp_stage")
-        reference_node = stage_net.createNode("reference", f"temp_ref")
-        reference_node.parm("filepath1").set(str(usd_file_path))
+        tables = [row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
 
-        # create camera
-        camera_node = stage_net.createNode("camera", f"temp_cam")
-        camera_node.setInput(0, reference_node)
-        camera_node.parm("primpath").set("/cameras/thumbnail_cam")
-
-        # camera settings
-        focal_length = 50  # mm
-        horizontal_aperture = 20.955  # mm
-        aspect_ratio = 1.0
-        camera_node.parm("aspectratiox").set(1)
-        camera_node.parm("aspectratioy").set(1)
-        camera_node.parm("horizontalAperture").set(horizontal_aperture)
-        camera_node.parm("focalLength").set(focal_length)
-
-        # =================
-        # Calculate camera position
-        # =================
-        # Create SOPs net to load in geo and get the geo info for camera calculations
-        reference_sops = hou.node(f"/obj").createNode("geo", f"temp_sops")
-        usdimport_node = reference_sops.createNode("usdimport", f"temp_usd_import_sops")
-        usdimport_node.parm("filepath1").set(str(usd_file_path))
-        unpackusd_node = reference_sops.createNode("unpackusd", f"temp_unpackusd")
-        unpackusd_node.setInput(0, usdimport_node)
-        unpackusd_node.parm("output").set("polygons")
-        unpackusd_node_geo = unpackusd_node.geometry()
-
-        bbox = unpackusd_node_geo.boundingBox()
-        center = bbox.center()
-        size = bbox.sizevec()
+        candidates = []
+        for table in tables:
+            columns = {row[1].lower(): row[1] for row in connection.execute(f'PRAGMA table_info("{table}")')}
+            path_column = next((columns[name] for name in path_columns if name in columns), None)
+            id_column = next((columns[name] for name in id_columns if name in columns), None)
+            if path_column and id_column:
+                # prefer the table that looks like the item table
+                preferred = table.lower() in ('item', 'items', 'asset', 'assets')
+                candidates.append((not preferred, table, id_column, path_column))
 
-        # Configure look-at constraint to aim camera at object center
-        camera_node.parm("lookatenable").set(1)
-        camera_node.parm("lookatpositionx").set(center[0])
-        camera_node.parm("lookatpositiony").set(center[1])
-        camera_node.parm("lookatpositionz").set(center[2])
-
-        # Calculate the bounding box diagonal (maximum extent of the object)
-        bbox_diagonal = math.sqrt(size[0]**2 + size[1]**2 + size[2]**2)
-
-        # Calculate horizontal and vertical field of view in radians
-        # Formula: FOV = 2 * arctan(aperture / (2 * focal_length))
-        horizontal_fov_rad = 2 * math.atan(horizontal_aperture / (2 * focal_length))
-        vertical_fov_rad = 2 * math.atan((horizontal_aperture / aspect_ratio) / (2 * focal_length))
-
-        # Use the smaller FOV to ensure the object fits in both dimensions
-        fov_rad = min(horizontal_fov_rad, vertical_fov_rad)
-
-        # Calculate distance needed to fit the entire object in frame
-        # Formula: distance = (bbox_diagonal / 2) / tan(fov / 2)
-        # Multiply by 1.1 to add 10% padding
-        distance = (bbox_diagonal / 2) / math.tan(fov_rad / 2) * 1.1
-
-        # Define camera rotation angles in radians
-        # -30° pitch (looking down at the object)
-        # 45° yaw (viewing from the side)
-        rx_rad = math.radians(-30)
-        ry_rad = math.radians(45)
-
-        # Calculate camera offset from object center using spherical positioning
-        # Step 1: Apply yaw rotation (rotate around Y axis to position camera at 45° angle)
-        cam_offset_x = distance * math.sin(ry_rad)
-        cam_offset_z = distance * math.cos(ry_rad)
-        cam_offset_y = 0
-        # Step 2: Apply pitch rotation (tilt camera position upward by rotating around X axis)
-        cam_offset_y_final = cam_offset_y * math.cos(rx_rad) - cam_offset_z * math.sin(rx_rad)
-        cam_offset_z_final = cam_offset_y * math.sin(rx_rad) + cam_offset_z * math.cos(rx_rad)
-
-        # Calculate final world-space camera position by adding offset to object center
-        cam_pos_x = center[0] + cam_offset_x
-        cam_pos_y = center[1] + cam_offset_y_final
-        cam_pos_z = center[2] + cam_offset_z_final
+        if not candidates:
+            return None
 
-        # Apply the calculated position to the camera node
-        camera_node.parm("tx").set(cam_pos_x)
-        camera_node.parm("ty").set(cam_pos_y)
-        camera_node.parm("tz").set(cam_pos_z)
-        # =================
-        # Calculate camera position END
-        # =================
+        _, table, id_column, path_column = sorted(candidates)[0]
+        return connection.execute(f'SELECT "{id_column}", "{path_column}" FROM "{table}"').fetchall()
+    except sqlite3.Error:
+        return None
+    finally:
+        connection.close()
 
-        # create karma render settings
-        karma_settings = stage_net.createNode("karmarendersettings", f"temp_karma")
-        karma_settings.setInput(0, camera_node)
-        karma_settings.parm("camera").set("/cameras/thumbnail_cam")
-        karma_settings.parm("res_mode").set("Manual")
-        karma_settings.parm("res_mode").pressButton()
-        karma_settings.parm("resolutionx").set(resolution[0])
-        karma_settings.parm("resolutiony").set(resolution[1])
-        karma_settings.parm("picture").set(temp_image_path)
 
-        # create USD render rop
-        usdrop = stage_net.createNode("usdrender_rop", f"temp_usdrender_rop")
-        usdrop.setInput(0, karma_settings)
-        usdrop.parm("execute").pressButton()
-
-        # load the rendered image
-        if os.path.exists(temp_image_path):
-            with open(temp_image_path, 'rb') as f:
-                thumbnail_data = f.read()
-            print(f"    Generated thumbnail from USD ({len(thumbnail_data)} bytes)")
-            return thumbnail_data
-        else:
-            print(f"    Thumbnail generation failed: output file not created")
-            return b''
+def get_existing_asset_index(datasource, database_path=None, use_cache=True):
+    """
+    Get a dict of absolute file path -> item id for all existing assets in the database.
+
+    With database_path, all paths are read in one query against the SQLite file (checked against
+    datasource.itemIds() so a misread schema is never trusted) instead of one filePath() call per
+    item. The result is cached next to the database and reused until the database file changes.
+    Falls back to the per-item API when the file can't be read that way.
+    """
+    cache_path = sidecar_path(database_path, 'paths.json') if database_path else None
+    stamp = database_stamp(os.path.abspath(database_path)) if database_path else None
+
+    try:
+        item_ids = datasource.itemIds() if datasource else None
     except Exception as e:
-        print(f"    Error generating thumbnail from USD: {e}")
-        return b''
-    finally:
-        # Cleanup
-        try:
-            if stage_net:
-                stage_net.destroy()
-            if reference_sops:
-                reference_sops.destroy()
-        except:
-            pass
+        print(f"WARNING: Error reading existing assets: {e}")
+        return {}
 
+    # reuse the index from the last run if the database hasn't changed since
+    if use_cache and cache_path:
         try:
-            if temp_image_path and os.path.exists(temp_image_path):
-                os.unlink(temp_image_path)
-        except:
+            with open(cache_path, 'r') as f:
+                cached = json.load(f)
+            # the item count is a cheap extra check in case the file stamp didn't change
+            if cached.get('stamp') == stamp and (item_ids is None or len(item_ids) == len(cached['items'])):
+                existing_index = {path: item_id for path, item_id in cached['items']}
+                print(f"  Loaded {len(existing_index)} existing asset path(s) from cache")
+                return existing_index
+        except (OSError, ValueError, KeyError, TypeError):
             pass
 
+    existing_index = None
+    try:
+        rows = read_gallery_paths_sqlite(database_path) if database_path else None
 
-def import_asset(datasource, asset_info, existing_paths, import_variants=True, generate_thumbnails=True, tags=None):
-    """
-    Import a single asset (and optionally its variants) into the database.
-    """
-    success = 0
+        if rows is not None and item_ids is not None:
+            # map onto the API's ids, and only trust the rows if they match the API item for item
+            api_ids = {str(item_id): item_id for item_id in item_ids}
+            if len(rows) == len(api_ids) and all(str(row_id) in api_ids for row_id, _ in rows):
+                existing_index = {
+                    os.path.abspath(file_path): api_ids[str(row_id)] for row_id, file_path in rows if file_path
+                }
+            else:
+                print("  Database file does not match the gallery items, reading existing assets item by item")
+        elif rows is not None:
+            # no datasource to check against, e.g. a dry run
+            existing_index = {os.path.abspath(file_path): row_id for row_id, file_path in rows if file_path}
+        elif item_ids is None and database_path and os.path.isfile(database_path) and os.path.getsize(database_path):
+            print(f"WARNING: Can't read existing items from {database_path} without hou, treating it as empty")
+
+        if existing_index is None and item_ids is not None:
+            existing_index = {}
+            for item_id in item_ids:
+                file_path = datasource.filePath(item_id)
+                if file_path:
+                    abs_path = os.path.abspath(file_path)
+                    existing_index[abs_path] = item_id
+
+    except Exception as e:
+        print(f"WARNING: Error reading existing assets: {e}")
+        return {}
+
+    if existing_index is None:
+        return {}
+
+    if use_cache and cache_path:
+        try:
+            write_atomic(cache_path, json.dumps({'stamp': stamp, 'items': list(existing_index.items())}))
+        except (OSError, TypeError) as e:
+            print(f"WARNING: Failed to cache existing asset paths: {e}")
+
+    return existing_index
+
+
+def get_existing_asset_paths(datasource, database_path=None, use_cache=True):
+    """
+    Get a set of file paths for all existing assets in the database, see get_existing_asset_index.
+    """
+    return set(get_existing_asset_index(datasource, database_path, use_cache))
+
+
+def hash_file_contents(file_path, chunk_size=1024 * 1024, fast=False):
+    """
+    blake2b hex digest of a file's contents, read in chunks so big files don't need to fit in memory.
+    With fast, an xxh3 digest if xxhash is installed.
+    """
+    digest = xxhash.xxh3_128() if fast and xxhash else hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ThumbnailCache:
+    """
+    On-disk cache of rendered thumbnails, safe to put on a shared scratch volume.
+
+    Entries are keyed by the USD file's identity plus the render settings (resolution and framing),
+    so republishing a file or changing the framing misses the cache. The identity is the path, size
+    and mtime, or with hash_contents the size and a hash of the contents, which also shares entries
+    between copies of a file at different paths.
+
+    Reading an entry bumps its mtime, and once the cache grows past max_bytes the least recently
+    used entries are deleted.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_THUMBNAIL_CACHE_SIZE_GB * 1024**3, hash_contents=False,
+                 settings=None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hash_contents = hash_contents
+        self.settings = settings or {}
+        self.lock = threading.Lock()
+        self.known_keys = {}  # (path, size, mtime_ns) -> key, saves re-hashing a file
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.total_bytes = sum(size for _, size, _ in self._entries())
+
+    def _entries(self):
+        """
+        (path, size, mtime) of every entry in the cache.
+        """
+        with os.scandir(self.directory) as buckets:
+            bucket_paths = [bucket.path for bucket in buckets if bucket.is_dir()]
+
+        for bucket_path in bucket_paths:
+            with os.scandir(bucket_path) as entries:
+                for entry in entries:
+                    if entry.is_file() and not entry.name.endswith('.tmp'):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        yield (entry.path, stat.st_size, stat.st_mtime)
+
+    def _entry_path(self, key):
+        return self.directory / key[:2] / f"{key}.jpg"
+
+    def key(self, usd_file_path):
+        """
+        Cache key for a USD file with this cache's render settings, or None if it can't be read.
+        """
+        try:
+            usd_file_path = os.path.abspath(usd_file_path)
+            stat = os.stat(usd_file_path)
+            identity = (usd_file_path, stat.st_size, stat.st_mtime_ns)
+
+            with self.lock:
+                if identity in self.known_keys:
+                    return self.known_keys[identity]
+
+            if self.hash_contents:
+                source = {'size': stat.st_size, 'content_hash': hash_file_contents(usd_file_path)}
+            else:
+                source = {'path': usd_file_path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        except OSError:
+            return None
+
+        key_data = json.dumps({'source': source, 'settings': self.settings}, sort_keys=True)
+        key = hashlib.blake2b(key_data.encode('utf-8'), digest_size=20).hexdigest()
+        with self.lock:
+            self.known_keys[identity] = key
+        return key
+
+    def get(self, key):
+        """
+        Cached image bytes for a key, or None on a miss.
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'rb') as f:
+                data = f.read()
+            # mark as recently used for eviction
+            os.utime(entry_path)
+            return data
+        except OSError:
+            return None
+
+    def contains(self, usd_file_path):
+        """
+        Whether there's a cached thumbnail for a USD file.
+        """
+        key = self.key(usd_file_path)
+        return key is not None and self._entry_path(key).exists()
+
+    def put(self, key, data):
+        """
+        Store image bytes under a key, evicting old entries if the cache is over its size cap.
+        """
+        if not data:
+            return
+
+        entry_path = self._entry_path(key)
+        try:
+            entry_path.parent.mkdir(exist_ok=True)
+            write_atomic(entry_path, data)
+        except OSError as e:
+            print(f"WARNING: Failed to write thumbnail cache entry {entry_path}: {e}")
+            return
+
+        with self.lock:
+            self.total_bytes += len(data)
+            over_cap = self.total_bytes > self.max_bytes
+        if over_cap:
+            self.evict()
+
+    def evict(self):
+        """
+        Delete least recently used entries until the cache is back under 90% of its size cap.
+        """
+        with self.lock:
+            # other processes may share the cache, so work from what's actually on disk
+            entries = sorted(self._entries(), key=lambda entry: entry[2])
+            total_bytes = sum(size for _, size, _ in entries)
+            target_bytes = self.max_bytes * 0.9
+            removed = 0
+
+            for path, size, _ in entries:
+                if total_bytes <= target_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                total_bytes -= size
+                removed += 1
+
+            self.total_bytes = total_bytes
+
+        if removed:
+            print(f"    Evicted {removed} thumbnail(s) from cache {self.directory}")
+
+
+def render_with_cache(usd_file_path, render, cache=None):
+    """
+    Render a thumbnail with render(usd_file_path), checking the cache first and filling it after.
+    """
+    key = cache.key(usd_file_path) if cache else None
+    if key:
+        thumbnail_data = cache.get(key)
+        if thumbnail_data:
+            print(f"    Loaded thumbnail from cache ({len(thumbnail_data)} bytes)")
+            return thumbnail_data
+
+    with timings.stage('thumbnail_render'):
+        thumbnail_data = render(usd_file_path)
+    if key and thumbnail_data:
+        cache.put(key, thumbnail_data)
+    return thumbnail_data
+
+
+def load_thumbnail(thumbnail_path, generate_if_missing=False, usd_file_path=None, renderer=None, cache=None):
+    """
+    Load thumbnail image data from a file, optionally generating it if missing.
+
+    renderer is called with the USD file path to generate a missing thumbnail, it defaults to
+    generate_thumbnail_from_usd. Generated thumbnails go through the ThumbnailCache if one is given.
+    """
+    # try to load existing thumbnail
+    if thumbnail_path and thumbnail_path.exists():
+        try:
+            with timings.stage('thumbnail_load'), open(thumbnail_path, 'rb') as f:
+                return f.read()
+        except Exception as e:
+            print(f"WARNING: Failed to load thumbnail {thumbnail_path}: {e}")
+
+    # generate thumbnail otherwise
+    if generate_if_missing and usd_file_path:
+        if renderer is None:
+            return generate_thumbnail_from_usd(usd_file_path, cache=cache)
+        return render_with_cache(usd_file_path, renderer, cache)
+
+    return b''
+
+
+def normalize_thumbnail_data(data, max_edge=DEFAULT_THUMBNAIL_MAX_EDGE, image_format='jpeg',
+                             quality=DEFAULT_THUMBNAIL_QUALITY):
+    """
+    Decode image bytes, downscale so neither edge is over max_edge and re-encode as JPEG or WebP.
+    Runs in a ThumbnailNormalizer worker process.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        # lets the JPEG decoder skip most of the work for huge images
+        image.draft('RGB', (max_edge, max_edge))
+        image.load()
+
+        if image.mode in ('RGBA', 'LA', 'P', 'PA'):
+            # neither format is worth storing alpha in for a thumbnail, flatten it onto black
+            image = image.convert('RGBA')
+            flattened = Image.new('RGB', image.size, (0, 0, 0))
+            flattened.paste(image, mask=image.getchannel('A'))
+            image = flattened
+        elif image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+
+        image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+        output = io.BytesIO()
+        if image_format == 'webp':
+            image.save(output, format='WEBP', quality=quality, method=4)
+        else:
+            image.save(output, format='JPEG', quality=quality, optimize=True)
+        return output.getvalue()
+
+
+class ThumbnailNormalizer:
+    """
+    Downscales and recompresses thumbnails before they're stored, so artists' 8K PNGs don't bloat
+    the gallery database. Needs Pillow.
+
+    Images are decoded and re-encoded on a process pool (it's CPU bound, so threads wouldn't help).
+    Results are cached on disk by a hash of the source bytes plus the settings, so later runs skip
+    images they've already seen. If re-encoding doesn't make an image smaller, the original is kept.
+    """
+
+    def __init__(self, max_edge=DEFAULT_THUMBNAIL_MAX_EDGE, image_format='jpeg', quality=DEFAULT_THUMBNAIL_QUALITY,
+                 workers=None, cache=None):
+        self.max_edge = max_edge
+        self.image_format = image_format
+        self.quality = quality
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = cache
+        self.settings = json.dumps({'max_edge': max_edge, 'format': image_format, 'quality': quality}).encode('utf-8')
+        self.lock = threading.Lock()
+        self.count = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+        self.pool = start_process_pool(self.workers)
+
+    def key(self, data):
+        digest = hashlib.blake2b(data, digest_size=20)
+        digest.update(self.settings)
+        return digest.hexdigest()
+
+    def normalize(self, data):
+        """
+        Normalised bytes for an image, or the original bytes if it can't be decoded.
+        """
+        if not data:
+            return data
+
+        key = self.key(data)
+        normalized = self.cache.get(key) if self.cache else None
+        if not normalized:
+            try:
+                with timings.stage('thumbnail_normalize'):
+                    normalized = self.pool.submit(
+                        normalize_thumbnail_data, data, self.max_edge, self.image_format, self.quality
+                    ).result()
+            except Exception as e:
+                print(f"WARNING: Failed to normalise thumbnail, storing it as is: {e}")
+                return data
+
+            if len(normalized) >= len(data):
+                normalized = data
+            if self.cache:
+                self.cache.put(key, normalized)
+
+        with self.lock:
+            self.count += 1
+            self.bytes_in += len(data)
+            self.bytes_out += len(normalized)
+        return normalized
+
+    def normalize_all(self, thumbnails):
+        """
+        Normalise every value of a prepare_asset_thumbnails dict.
+        """
+        return {usd_file: self.normalize(data) for usd_file, data in thumbnails.items()}
+
+    def report(self):
+        print(f"  Thumbnails normalised: {self.count}, {format_size(self.bytes_in)} -> "
+              f"{format_size(self.bytes_out)} ({format_size(self.bytes_in - self.bytes_out)} saved)")
+
+    def close(self):
+        self.pool.shutdown()
+
+
+def open_thumbnail_normalizer(database_path, max_edge=DEFAULT_THUMBNAIL_MAX_EDGE, image_format='jpeg',
+                              quality=DEFAULT_THUMBNAIL_QUALITY, workers=None,
+                              cache_size_gb=DEFAULT_THUMBNAIL_CACHE_SIZE_GB):
+    """
+    A ThumbnailNormalizer caching next to the database, or None (with a warning) without Pillow.
+    """
+    if Image is None:
+        print("WARNING: Pillow is not installed, thumbnails will be stored as they are")
+        return None
+
+    cache = ThumbnailCache(sidecar_path(database_path, 'normalized'), max_bytes=int(cache_size_gb * 1024**3))
+    return ThumbnailNormalizer(max_edge, image_format, quality, workers, cache)
+
+
+def compute_thumbnail_camera_position(center, size, focal_length, horizontal_aperture, aspect_ratio=1.0):
+    """
+    Camera position that frames a bounding box (center, size) from a 3/4 view above the object.
+    """
+    import math
+
+    # Calculate the bounding box diagonal (maximum extent of the object)
+    bbox_diagonal = math.sqrt(size[0]**2 + size[1]**2 + size[2]**2)
+
+    # Calculate horizontal and vertical field of view in radians
+    # Formula: FOV = 2 * arctan(aperture / (2 * focal_length))
+    horizontal_fov_rad = 2 * math.atan(horizontal_aperture / (2 * focal_length))
+    vertical_fov_rad = 2 * math.atan((horizontal_aperture / aspect_ratio) / (2 * focal_length))
+
+    # Use the smaller FOV to ensure the object fits in both dimensions
+    fov_rad = min(horizontal_fov_rad, vertical_fov_rad)
+
+    # Calculate distance needed to fit the entire object in frame
+    # Formula: distance = (bbox_diagonal / 2) / tan(fov / 2)
+    # Multiply by 1.1 to add 10% padding
+    distance = (bbox_diagonal / 2) / math.tan(fov_rad / 2) * 1.1
+
+    # Define camera rotation angles in radians
+    # -30° pitch (looking down at the object)
+    # 45° yaw (viewing from the side)
+    rx_rad = math.radians(-30)
+    ry_rad = math.radians(45)
+
+    # Calculate camera offset from object center using spherical positioning
+    # Step 1: Apply yaw rotation (rotate around Y axis to position camera at 45° angle)
+    cam_offset_x = distance * math.sin(ry_rad)
+    cam_offset_z = distance * math.cos(ry_rad)
+    cam_offset_y = 0
+    # Step 2: Apply pitch rotation (tilt camera position upward by rotating around X axis)
+    cam_offset_y_final = cam_offset_y * math.cos(rx_rad) - cam_offset_z * math.sin(rx_rad)
+    cam_offset_z_final = cam_offset_y * math.sin(rx_rad) + cam_offset_z * math.cos(rx_rad)
+
+    # Calculate final world-space camera position by adding offset to object center
+    cam_pos_x = center[0] + cam_offset_x
+    cam_pos_y = center[1] + cam_offset_y_final
+    cam_pos_z = center[2] + cam_offset_z_final
+
+    return (cam_pos_x, cam_pos_y, cam_pos_z)
+
+
+def compute_usd_bounds(usd_file_path):
+    """
+    Bounding box (center, size) of a USD file from its authored extents, read straight off the
+    stage without converting any geometry.
+
+    Uses the root prim's extentsHint if it has one (checked with payloads unloaded first),
+    otherwise the authored extent of every gprim, with payloads loaded if there are any. Returns None if the bounds can't be worked out
+    this way, e.g. a gprim has no authored extent, so the caller can fall back to cooking geometry.
+    """
+    try:
+        from pxr import Gf, Usd, UsdGeom
+    except ImportError:
+        return None
+
+    def root_prims(stage):
+        default_prim = stage.GetDefaultPrim()
+        if default_prim:
+            return [default_prim]
+        return [prim for prim in stage.GetPseudoRoot().GetChildren() if prim.IsActive()]
+
+    def has_extents_hint(root):
+        return UsdGeom.ModelAPI(root).GetExtentsHintAttr().HasAuthoredValue()
+
+    def has_complete_extents(roots):
+        found_gprim = False
+        for root in roots:
+            # extentsHint on the root covers everything below it
+            if has_extents_hint(root):
+                found_gprim = True
+                continue
+            for prim in Usd.PrimRange(root):
+                if prim.IsA(UsdGeom.Gprim):
+                    if not UsdGeom.Gprim(prim).GetExtentAttr().HasAuthoredValue():
+                        return False
+                    found_gprim = True
+        return found_gprim
+
+    def hint_range(root):
+        # extentsHint holds a (min, max) pair per purpose, in order default, render, proxy, guide
+        hint = UsdGeom.ModelAPI(root).GetExtentsHint()
+        local_range = Gf.Range3d()
+        for i in range(0, min(len(hint), 4), 2):
+            local_range.UnionWith(Gf.Range3d(Gf.Vec3d(hint[i]), Gf.Vec3d(hint[i + 1])))
+        to_world = Gf.Matrix4d(1)
+        if root.IsA(UsdGeom.Xformable):
+            to_world = UsdGeom.Xformable(root).ComputeLocalToWorldTransform(Usd.TimeCode.Default())
+        return Gf.BBox3d(local_range, to_world).ComputeAlignedRange()
+
+    try:
+        # payloads unloaded first, component builder authors extentsHint on the root prim
+        stage = Usd.Stage.Open(str(usd_file_path), Usd.Stage.LoadNone)
+        roots = root_prims(stage)
+        # gprims inside unloaded payloads aren't on the stage, so unless every root has a hint the
+        # unloaded stage can only be trusted when it has no payloads at all
+        if not (roots and all(has_extents_hint(root) for root in roots)) and stage.FindLoadable():
+            # loading payloads only reads what we ask for
+            stage.Load()
+            roots = root_prims(stage)
+        if not has_complete_extents(roots):
+            return None
+
+        bbox_cache = UsdGeom.BBoxCache(Usd.TimeCode.Default(), [UsdGeom.Tokens.default_, UsdGeom.Tokens.render])
+        bbox_range = Gf.Range3d()
+        for root in roots:
+            if has_extents_hint(root):
+                bbox_range.UnionWith(hint_range(root))
+            else:
+                bbox_range.UnionWith(bbox_cache.ComputeWorldBound(root).ComputeAlignedRange())
+
+        if bbox_range.IsEmpty():
+            return None
+
+        return (tuple(bbox_range.GetMidpoint()), tuple(bbox_range.GetSize()))
+    except Exception as e:
+        print(f"    Could not read extents from {usd_file_path}, falling back to geometry: {e}")
+        return None
+
+
+USD_COUNT_KEYS = ('usd_prim_count', 'usd_mesh_count', 'usd_face_count')
+
+
+def read_usd_metadata(usd_file_path, counts=False):
+    """
+    Stage metadata and variant sets of a USD file (and with counts, its prim counts), as gallery
+    metadata. Runs in a UsdMetadataHarvester worker process.
+
+    Stage metadata and variant sets are read with payloads unloaded. The counts need the geometry,
+    which component builder keeps in a payload, so payloads are loaded for those (faceVertexCounts
+    is the only attribute value read). That composes the whole asset, which is slow on heavy hero
+    assets, hence opt in. Instanced geometry is counted once.
+    """
+    from pxr import Tf, Usd, UsdGeom
+
+    try:
+        stage = Usd.Stage.Open(str(usd_file_path), Usd.Stage.LoadNone)
+    except Tf.ErrorException as e:
+        # pxr errors can't be pickled back to the importer
+        raise RuntimeError(str(e).strip()) from None
+    default_prim = stage.GetDefaultPrim()
+    metadata = {
+        'usd_default_prim': default_prim.GetName() if default_prim else '',
+        'usd_up_axis': str(UsdGeom.GetStageUpAxis(stage)),
+        'usd_meters_per_unit': UsdGeom.GetStageMetersPerUnit(stage),
+    }
+
+    # variant sets artists can switch, i.e. the ones on the default prim (or every root prim)
+    roots = [default_prim] if default_prim else stage.GetPseudoRoot().GetChildren()
+    variant_sets = {}
+    for root in roots:
+        root_variant_sets = root.GetVariantSets()
+        for name in root_variant_sets.GetNames():
+            variant_sets.setdefault(name, sorted(root_variant_sets.GetVariantSet(name).GetVariantNames()))
+    metadata['usd_variant_sets'] = variant_sets
+
+    if not counts:
+        return metadata
+
+    stage.Load()
+    prims = 0
+    meshes = 0
+    faces = 0
+    for prim in stage.Traverse():
+        prims += 1
+        if prim.IsA(UsdGeom.Mesh):
+            meshes += 1
+            face_vertex_counts = UsdGeom.Mesh(prim).GetFaceVertexCountsAttr().Get()
+            faces += len(face_vertex_counts) if face_vertex_counts else 0
+    metadata.update({
+        'usd_prim_count': prims,
+        'usd_mesh_count': meshes,
+        'usd_face_count': faces,
+    })
+    return metadata
+
+
+class UsdMetadataHarvester(JsonSidecar):
+    """
+    Reads the USD metadata artists filter the gallery by (see read_usd_metadata) for every file
+    being imported. Needs pxr.
+
+    Stages are opened on a process pool, composing them is CPU bound and holds the GIL. Results are
+    cached in a JSON file next to the database, keyed by path and checked against the file's size
+    and mtime, so re-imports only open files that changed. Prim counts are only read with counts.
+    """
+
+    VERSION = 1
+    DESCRIPTION = 'USD metadata cache'
+
+    def __init__(self, cache_path=None, workers=None, counts=False):
+        super().__init__(cache_path)
+        self.workers = workers or os.cpu_count() or 1
+        self.counts = counts
+        self.entries = {}  # path -> {'identity': [size, mtime_ns], 'metadata': {...}}
+        self.lock = threading.Lock()
+        self.harvested = 0
+        self.cached = 0
+        self.failed = 0
+        self.load()
+        self.pool = start_process_pool(self.workers)
+
+    def load(self):
+        data = self.read()
+        if data is not None:
+            self.entries = data.get('entries', {})
+            print(f"Loaded USD metadata cache with {len(self.entries)} files: {self.path}")
+
+    def harvest(self, usd_file):
+        """
+        Metadata for one USD file, or {} if it can't be read.
+        """
+        path = str(usd_file)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return {}
+        identity = [stat.st_size, stat.st_mtime_ns]
+
+        with self.lock:
+            entry = self.entries.get(path)
+            # entries read with counts also serve runs without them
+            if entry and entry['identity'] == identity and (not self.counts or USD_COUNT_KEYS[0] in entry['metadata']):
+                self.cached += 1
+                if self.counts:
+                    return entry['metadata']
+                return {key: value for key, value in entry['metadata'].items() if key not in USD_COUNT_KEYS}
+
+        try:
+            with timings.stage('usd_metadata'):
+                metadata = self.pool.submit(read_usd_metadata, path, self.counts).result()
+        except Exception as e:
+            print(f"WARNING: Failed to read USD metadata from {path}: {e}")
+            with self.lock:
+                self.failed += 1
+            return {}
+
+        with self.lock:
+            self.entries[path] = {'identity': identity, 'metadata': metadata}
+            self.harvested += 1
+        return metadata
+
+    def harvest_all(self, usd_files):
+        """
+        Metadata for each file, keyed by str(usd_file) like prepare_asset_thumbnails.
+        """
+        return {str(usd_file): self.harvest(usd_file) for usd_file in usd_files}
+
+    def report(self):
+        print(f"  USD metadata read:     {self.harvested} file(s), {self.cached} from cache, {self.failed} failed")
+
+    def save(self):
+        with self.lock:
+            self.write({'entries': self.entries})
+
+    def close(self):
+        self.pool.shutdown()
+        self.save()
+
+
+def open_usd_metadata_harvester(database_path, workers=None, counts=False):
+    """
+    A UsdMetadataHarvester caching next to the database, or None (with a warning) without pxr.
+    """
+    try:
+        from pxr import Usd  # noqa: F401
+    except ImportError:
+        print("WARNING: pxr is not available, USD metadata will not be read")
+        return None
+
+    return UsdMetadataHarvester(sidecar_path(database_path, 'usdmeta.json'), workers, counts)
+
+
+def read_usd_variant_sets(usd_file_path):
+    """
+    Variant sets artists can switch on a USD file, read with payloads unloaded.
+
+    Returns (root prim name, {variant set: [variant names]}, {layer metadata key: value}), for the
+    default prim (or the first root prim with variant sets). The layer metadata is the stage
+    metadata authored on the file that a layer sublayering it has to repeat.
+    """
+    from pxr import Usd
+
+    stage = Usd.Stage.Open(str(usd_file_path), Usd.Stage.LoadNone)
+    roots = [stage.GetDefaultPrim()] if stage.GetDefaultPrim() else stage.GetPseudoRoot().GetChildren()
+    layer_metadata = {key: stage.GetMetadata(key) for key in ('upAxis', 'metersPerUnit')
+                      if stage.HasAuthoredMetadata(key)}
+    for root in roots:
+        root_variant_sets = root.GetVariantSets()
+        names = root_variant_sets.GetNames()
+        if names:
+            variant_sets = {name: sorted(root_variant_sets.GetVariantSet(name).GetVariantNames()) for name in names}
+            return (root.GetName(), variant_sets, layer_metadata)
+    return (None, {}, layer_metadata)
+
+
+def read_variant_layer(usd_file_path):
+    """
+    The variant selection a VariantSetLayers layer makes, as a dict with 'source', 'prim', 'set' and
+    'variant', or None for any other file. Other files are told apart by path, without opening them.
+    """
+    if not Path(usd_file_path).parent.parent.name.endswith('.' + VARIANT_LAYERS_SUFFIX):
+        return None
+    try:
+        from pxr import Sdf
+        layer = Sdf.Layer.FindOrOpen(str(usd_file_path))
+    except Exception:
+        return None
+    selection = layer.customLayerData.get(VariantSetLayers.LAYER_DATA_KEY) if layer else None
+    return dict(selection) if selection else None
+
+
+class VariantSetLayers:
+    """
+    Imports the variant sets authored inside assets' primary USD files as gallery variants, for
+    --variant-sets. Needs pxr.
+
+    A gallery item is a file, so each variant selection gets a small .usda layer, next to the database, that
+    sublayers the primary file and selects the variant. The layers are appended to the asset's
+    variants, so they're imported, updated and cached like variant files. A layer is only rewritten
+    when its contents change, which includes the primary file's mtime so --update picks republished
+    assets up. ThumbnailRenderScene renders them by switching the variant on the already
+    referenced asset, rather than loading the asset again per variant.
+
+    Layers are added before --dedupe hashes the asset, which identifies them by their primary file's
+    contents and the variant they select (see ContentHashIndex.mark_duplicates).
+    """
+
+    LAYER_DATA_KEY = 'asset_catalogue_variant'
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        # layers are written by us, so only the directory can have symlinks in it
+        self.resolved_directory = os.path.realpath(self.directory)
+
+    @staticmethod
+    def file_name(name):
+        return ''.join(c if c.isalnum() or c in '-_' else '_' for c in name)
+
+    def layer_path(self, asset_info, variant_set, variant):
+        source = asset_info.resolved_primary
+        # assets with the same name under different assets directories get their own folders
+        folder = f"{asset_info.name}_{hashlib.blake2b(source.encode('utf-8'), digest_size=4).hexdigest()}"
+        return self.directory / folder / f"{self.file_name(variant_set)}_{self.file_name(variant)}.usda"
+
+    def write_layer(self, layer_path, source, prim_name, variant_set, variant, layer_metadata):
+        from pxr import Sdf
+
+        layer = Sdf.Layer.CreateAnonymous('.usda')
+        layer.subLayerPaths.append(source)
+        layer.defaultPrim = prim_name
+        for key, value in layer_metadata.items():
+            layer.pseudoRoot.SetInfo(key, value)
+        layer.customLayerData = {self.LAYER_DATA_KEY: {
+            'source': source,
+            'source_mtime': str(os.stat(source).st_mtime_ns),
+            'prim': '/' + prim_name,
+            'set': variant_set,
+            'variant': variant,
+        }}
+        over = Sdf.PrimSpec(layer, prim_name, Sdf.SpecifierOver)
+        over.variantSelections[variant_set] = variant
+        text = layer.ExportToString()
+
+        try:
+            with open(layer_path, 'r') as f:
+                if f.read() == text:
+                    return
+        except OSError:
+            pass
+        layer_path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(layer_path, text)
+
+    def add_variants(self, asset_info):
+        """
+        Write a layer per variant selection of the asset's primary file and append them to
+        asset_info.variants (without thumbnails, so they get rendered).
+
+        Returns {str(layer path): metadata} with the variant set and variant of each layer, also kept
+        in asset_info.variant_selections.
+        """
+        try:
+            with timings.stage('variant_sets', asset_info.timing_key):
+                prim_name, variant_sets, layer_metadata = read_usd_variant_sets(asset_info.primary_file)
+                source = asset_info.resolved_primary
+                metadata = {}
+                for variant_set, variants in variant_sets.items():
+                    for variant in variants:
+                        layer_path = self.layer_path(asset_info, variant_set, variant)
+                        self.write_layer(layer_path, source, prim_name, variant_set, variant, layer_metadata)
+                        asset_info.variants.append((layer_path, None))
+                        asset_info.resolved_paths[str(layer_path)] = os.path.join(
+                            self.resolved_directory, layer_path.parent.name, layer_path.name
+                        )
+                        metadata[str(layer_path)] = {'usd_variant_set': variant_set, 'usd_variant': variant}
+        except Exception as e:
+            print(f"WARNING: Failed to read variant sets of {asset_info.primary_file}: {e}")
+            return {}
+        asset_info.variant_selections = metadata
+        return metadata
+
+
+def open_variant_set_layers(database_path):
+    """
+    VariantSetLayers writing next to the database, or None (with a warning) without pxr.
+    """
+    try:
+        from pxr import Sdf, Usd  # noqa: F401
+    except ImportError:
+        print("WARNING: pxr is not available, variant sets inside USD files will not be imported")
+        return None
+
+    return VariantSetLayers(sidecar_path(database_path, VARIANT_LAYERS_SUFFIX))
+
+
+def thumbnail_engine_for(usd_file_path):
+    """
+    Engine --thumbnail-engine auto renders a USD file with, picked from AUTO_THUMBNAIL_ENGINES by the
+    size of the USD files in its asset directory (component builder keeps the geometry payload next
+    to the primary file, variants usually reference it).
+    """
+    selection = read_variant_layer(usd_file_path)
+    directory = Path(selection['source'] if selection else usd_file_path).parent
+    if directory.name.casefold() == 'variants':
+        directory = directory.parent
+
+    size = 0
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if os.path.splitext(entry.name)[1].lower() in USD_EXTENSIONS and entry.is_file():
+                    size += entry.stat().st_size
+    except OSError:
+        pass
+
+    for limit, engine in AUTO_THUMBNAIL_ENGINES:
+        if limit is None or size <= limit:
+            return engine
+
+
+def thumbnail_time_budget(engine, time_budget=None):
+    """
+    Seconds a render with engine may take, None for no limit. Previews always get a budget.
+    """
+    if time_budget:
+        return time_budget
+    return DEFAULT_PREVIEW_TIME_BUDGET if engine == 'preview' else None
+
+
+class ThumbnailRenderScene:
+    """
+    Node network for rendering USD thumbnails, built once and reused for every asset.
+
+    Rendering an asset only swaps the USD file on the reference LOP and re-aims the camera,
+    instead of creating and destroying the whole network per thumbnail. Layers written by
+    VariantSetLayers are rendered by referencing their source file and switching the variant on the
+    set variant LOP, so rendering every variant of an asset in a row only loads it once.
+
+    engine is one of THUMBNAIL_ENGINES. preview renders with Storm, karma-fast with few samples and
+    denoising, karma with the render settings' defaults, and auto picks one per asset with
+    thumbnail_engine_for. Karma renders are capped at the time budget where Karma supports it,
+    Storm has no limit here (ThumbnailRenderPool enforces budgets by killing its workers). Framing
+    comes from the authored USD extents where possible, the SOP chain that cooks the geometry for a
+    bounding box is only built for assets without them. Call destroy() (or use it as a context
+    manager) to clean the nodes up.
+    """
+
+    # camera settings
+    FOCAL_LENGTH = 50  # mm
+    HORIZONTAL_APERTURE = 20.955  # mm
+    ASPECT_RATIO = 1.0
+    # bump when the framing or render setup changes, so cached thumbnails get re-rendered
+    FRAMING_VERSION = 1
+    # usdrender_rop renderer for each engine
+    RENDERERS = {'preview': 'HdStormRendererPlugin', 'karma-fast': 'BRAY_HdKarma', 'karma': 'BRAY_HdKarma'}
+    # karma render settings changed for karma-fast, only the ones this Houdini version has, and put
+    # back to their defaults for karma
+    FAST_KARMA_SETTINGS = {
+        'engine': 'cpu',
+        'samplesperpixel': 4,
+        'varianceaa_maxsamples': 4,
+        'denoiser': 'oidn',
+    }
+
+    @classmethod
+    def render_settings(cls, resolution=(512, 512), engine=DEFAULT_THUMBNAIL_ENGINE):
+        """
+        Everything that affects how a thumbnail looks, used in ThumbnailCache keys.
+        """
+        settings = {
+            'resolution': list(resolution),
+            'focal_length': cls.FOCAL_LENGTH,
+            'horizontal_aperture': cls.HORIZONTAL_APERTURE,
+            'aspect_ratio': cls.ASPECT_RATIO,
+            'framing_version': cls.FRAMING_VERSION,
+        }
+        # left out for full karma so caches filled before engines existed stay valid
+        if engine != 'karma':
+            settings['engine'] = engine
+            settings['fast_karma_settings'] = cls.FAST_KARMA_SETTINGS
+        if engine == 'auto':
+            settings['auto_engines'] = [list(size_class) for size_class in AUTO_THUMBNAIL_ENGINES]
+        return settings
+
+    def __init__(self, resolution=(512, 512), engine=DEFAULT_THUMBNAIL_ENGINE, time_budget=None):
+        self.resolution = resolution
+        self.engine = engine
+        self.time_budget = time_budget
+        self.applied_engine = None
+        self.stage_net = None
+        self.reference_sops = None
+
+        load_hou()
+        try:
+            self._build()
+        except Exception:
+            self.destroy()
+            raise
+
+    def _build(self):
+        # create lopnet stage to render out thumbnail
+        self.stage_net = hou.node(f"/obj").createNode("lopnet", f"temp_stage")
+        self.reference_node = self.stage_net.createNode("reference", f"temp_ref")
+
+        # only enabled for variant layers, see select_variant
+        self.variant_node = self.stage_net.createNode("setvariant", f"temp_setvariant")
+        self.variant_node.setInput(0, self.reference_node)
+        self.variant_node.parm("num_variants").set(1)
+        self.variant_node.bypass(True)
+
+        # create camera
+        self.camera_node = self.stage_net.createNode("camera", f"temp_cam")
+        self.camera_node.setInput(0, self.variant_node)
+        self.camera_node.parm("primpath").set("/cameras/thumbnail_cam")
+        self.camera_node.parm("aspectratiox").set(1)
+        self.camera_node.parm("aspectratioy").set(1)
+        self.camera_node.parm("horizontalAperture").set(self.HORIZONTAL_APERTURE)
+        self.camera_node.parm("focalLength").set(self.FOCAL_LENGTH)
+        # Configure look-at constraint to aim camera at object center
+        self.camera_node.parm("lookatenable").set(1)
+
+        # create karma render settings
+        self.karma_settings = self.stage_net.createNode("karmarendersettings", f"temp_karma")
+        self.karma_settings.setInput(0, self.camera_node)
+        self.karma_settings.parm("camera").set("/cameras/thumbnail_cam")
+        self.karma_settings.parm("res_mode").set("Manual")
+        self.karma_settings.parm("res_mode").pressButton()
+        self.karma_settings.parm("resolutionx").set(self.resolution[0])
+        self.karma_settings.parm("resolutiony").set(self.resolution[1])
+
+        # create USD render rop
+        self.usdrop = self.stage_net.createNode("usdrender_rop", f"temp_usdrender_rop")
+        self.usdrop.setInput(0, self.karma_settings)
+
+    def _build_sops(self):
+        # Create SOPs net to load in geo and get the geo info for camera calculations
+        self.reference_sops = hou.node(f"/obj").createNode("geo", f"temp_sops")
+        self.usdimport_node = self.reference_sops.createNode("usdimport", f"temp_usd_import_sops")
+        self.unpackusd_node = self.reference_sops.createNode("unpackusd", f"temp_unpackusd")
+        self.unpackusd_node.setInput(0, self.usdimport_node)
+        self.unpackusd_node.parm("output").set("polygons")
+
+    def bounds(self, usd_file_path):
+        """
+        Bounding box (center, size) of the USD file.
+
+        Read from the authored extents if possible, otherwise by cooking it through the SOP chain
+        (which converts the whole asset to polygons, so is slow for heavy assets).
+        """
+        usd_bounds = compute_usd_bounds(usd_file_path)
+        if usd_bounds:
+            return usd_bounds
+
+        if self.reference_sops is None:
+            self._build_sops()
+        self.usdimport_node.parm("filepath1").set(str(usd_file_path))
+        bbox = self.unpackusd_node.geometry().boundingBox()
+        return (bbox.center(), bbox.sizevec())
+
+    @staticmethod
+    def set_parm(node, name, value):
+        """
+        Set a parm if this Houdini version has it (and takes the value), returns whether it did.
+        """
+        parm = node.parm(name)
+        if parm is None:
+            return False
+        try:
+            parm.set(value)
+        except Exception:
+            return False
+        return True
+
+    def use_engine(self, engine):
+        """
+        Switch the render setup to engine (not auto), does nothing if it's already set up for it.
+        """
+        if engine == self.applied_engine:
+            return
+        self.usdrop.parm("renderer").set(self.RENDERERS[engine])
+        for name, value in self.FAST_KARMA_SETTINGS.items():
+            if engine == 'karma-fast':
+                self.set_parm(self.karma_settings, name, value)
+            elif self.karma_settings.parm(name) is not None:
+                self.karma_settings.parm(name).revertToDefaults()
+
+        time_budget = thumbnail_time_budget(engine, self.time_budget)
+        if time_budget:
+            self.set_parm(self.karma_settings, "timelimit", time_budget)
+        elif self.karma_settings.parm("timelimit") is not None:
+            self.karma_settings.parm("timelimit").revertToDefaults()
+        self.applied_engine = engine
+
+    def select_variant(self, selection):
+        """
+        Switch the referenced asset to a variant, a read_variant_layer dict, or back to its
+        authored selections if it's None.
+        """
+        if not selection:
+            self.variant_node.bypass(True)
+            return
+        # selection['prim'] is where the layer's own stage has the prim, the reference LOP puts the
+        # source's default prim at its primpath instead
+        self.variant_node.parm("primpattern1").set(self.reference_node.evalParm("primpath1"))
+        self.variant_node.parm("variantset1").set(selection['set'])
+        self.variant_node.parm("variantname1").set(selection['variant'])
+        self.variant_node.bypass(False)
+
+    def frame(self, center, size):
+        """
+        Aim the camera at a bounding box and move it back far enough to fit it in frame.
+        """
+        self.camera_node.parm("lookatpositionx").set(center[0])
+        self.camera_node.parm("lookatpositiony").set(center[1])
+        self.camera_node.parm("lookatpositionz").set(center[2])
+
+        cam_pos = compute_thumbnail_camera_position(
+            center, size, self.FOCAL_LENGTH, self.HORIZONTAL_APERTURE, self.ASPECT_RATIO
+        )
+
+        # Apply the calculated position to the camera node
+        self.camera_node.parm("tx").set(cam_pos[0])
+        self.camera_node.parm("ty").set(cam_pos[1])
+        self.camera_node.parm("tz").set(cam_pos[2])
+
+    def render(self, usd_file_path, engine=None):
+        """
+        Render a thumbnail for a USD file, returns the image bytes (empty on failure). engine
+        overrides the scene's engine for this render.
+        """
+        import tempfile
+
+        # create temporary output file
+        with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp:
+            temp_image_path = tmp.name
+
+        try:
+            engine = engine or self.engine
+            if engine == 'auto':
+                engine = thumbnail_engine_for(usd_file_path)
+            self.use_engine(engine)
+
+            selection = read_variant_layer(usd_file_path)
+            # the reference only reloads when the file changes, not between variants of one asset
+            self.reference_node.parm("filepath1").set(selection['source'] if selection else str(usd_file_path))
+            self.select_variant(selection)
+            # the variant layer composes the same stage, so its extents are the selected variant's
+            self.frame(*self.bounds(usd_file_path))
+
+            self.karma_settings.parm("picture").set(temp_image_path)
+            self.usdrop.parm("execute").pressButton()
+
+            # load the rendered image
+            if os.path.exists(temp_image_path) and os.path.getsize(temp_image_path) > 0:
+                with open(temp_image_path, 'rb') as f:
+                    thumbnail_data = f.read()
+                print(f"    Generated thumbnail from USD ({len(thumbnail_data)} bytes, {engine})")
+                return thumbnail_data
+            else:
+                print(f"    Thumbnail generation failed: output file not created")
+                return b''
+        except Exception as e:
+            print(f"    Error generating thumbnail from USD: {e}")
+            return b''
+        finally:
+            try:
+                if temp_image_path and os.path.exists(temp_image_path):
+                    os.unlink(temp_image_path)
+            except:
+                pass
+
+    def destroy(self):
+        # Cleanup
+        try:
+            if self.stage_net:
+                self.stage_net.destroy()
+            if self.reference_sops:
+                self.reference_sops.destroy()
+        except:
+            pass
+        self.stage_net = None
+        self.reference_sops = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.destroy()
+
+
+def generate_thumbnail_from_usd(usd_file_path, resolution=(512, 512), cache=None, engine=DEFAULT_THUMBNAIL_ENGINE):
+    """
+    Generate a thumbnail image by rendering a USD file in Houdini.
+
+    Builds a one-off ThumbnailRenderScene, when rendering many files reuse a scene instead.
+    If a ThumbnailCache is given it's checked before rendering and filled after.
+    """
+    def render(usd_file_path):
+        try:
+            with ThumbnailRenderScene(resolution, engine) as scene:
+                return scene.render(usd_file_path)
+        except Exception as e:
+            print(f"    Error generating thumbnail from USD: {e}")
+            return b''
+
+    return render_with_cache(usd_file_path, render, cache)
+
+
+class LazyThumbnailRenderer:
+    """
+    Thumbnail renderer for load_thumbnail that builds a ThumbnailRenderScene on first use and then
+    reuses it, so a run with nothing to render never touches the scene.
+    """
+
+    def __init__(self, resolution=(512, 512), engine=DEFAULT_THUMBNAIL_ENGINE, time_budget=None):
+        self.resolution = resolution
+        self.engine = engine
+        self.time_budget = time_budget
+        self.scene = None
+
+    def __call__(self, usd_file_path, engine=None):
+        if self.scene is None:
+            try:
+                self.scene = ThumbnailRenderScene(self.resolution, self.engine, self.time_budget)
+            except Exception as e:
+                print(f"    Error generating thumbnail from USD: {e}")
+                return b''
+        return self.scene.render(usd_file_path, engine)
+
+    def close(self):
+        if self.scene:
+            self.scene.destroy()
+            self.scene = None
+
+
+def hython_executable():
+    """
+    Path to the hython executable used to start render workers.
+    """
+    hfs = os.environ.get('HFS')
+    if hfs:
+        name = 'hython.exe' if os.name == 'nt' else 'hython'
+        candidate = os.path.join(hfs, 'bin', name)
+        if os.path.exists(candidate):
+            return candidate
+    return sys.executable
+
+
+class ThumbnailRenderPool:
+    """
+    Pool of child hython processes that render thumbnails in parallel.
+
+    Each worker runs this script with RENDER_WORKER_FLAG and renders jobs with its own
+    ThumbnailRenderScene to its own temp file, sending the image bytes back over its stdout.
+    render() is thread safe and blocks until a worker is free, so N threads calling it keep N
+    workers busy.
+
+    Cores are split between workers with HOUDINI_MAXTHREADS, which caps the threads each worker
+    (and the karma render it starts) uses. By default each worker gets cpu_count / workers.
+
+    Workers are started on the first render, so a run with nothing to render doesn't start any.
+
+    Renders use engine (see ThumbnailRenderScene), with auto resolved here so each job's time budget
+    is known. A worker still rendering when its budget runs out is killed and replaced, and the
+    thumbnail is left empty. On POSIX each worker runs in its own session, so killing its process
+    group also stops the husk process usdrender_rop started.
+    """
+
+    def __init__(self, workers, karma_threads=None, resolution=(512, 512), engine=DEFAULT_THUMBNAIL_ENGINE,
+                 time_budget=None):
+        self.worker_count = max(1, workers)
+        self.karma_threads = karma_threads or max(1, (os.cpu_count() or 1) // self.worker_count)
+        self.resolution = resolution
+        self.engine = engine
+        self.time_budget = time_budget
+        self.idle_workers = queue.Queue()
+        self.processes = []
+        self.job_counter = 0
+        self.start_lock = threading.Lock()
+        self.started = False
+
+    def _start_workers(self):
+        with self.start_lock:
+            if self.started:
+                return
+            print(f"Starting {self.worker_count} thumbnail render worker(s) with {self.karma_threads} thread(s) each")
+            for _ in range(self.worker_count):
+                self.idle_workers.put(self._start_worker())
+            self.started = True
+
+    def _start_worker(self):
+        env = dict(os.environ)
+        env['HOUDINI_MAXTHREADS'] = str(self.karma_threads)
+        process = subprocess.Popen(
+            [hython_executable(), os.path.abspath(__file__), RENDER_WORKER_FLAG],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=env,
+            text=True,
+            bufsize=1,
+            # own session (and process group) so _kill can take the husk render down with the worker
+            start_new_session=os.name == 'posix'
+        )
+        self.processes.append(process)
+        return process
+
+    @staticmethod
+    def _kill(process):
+        """
+        Kill a worker and everything it started (the render itself runs in a husk child). Only the
+        worker itself is killed where there are no process groups, i.e. on Windows.
+        """
+        if os.name == 'posix':
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+                return
+            except OSError:
+                pass
+        process.kill()
+
+    def render(self, usd_file_path):
+        """
+        Render a thumbnail for usd_file_path on the next free worker, returns the image bytes.
+        """
+        if not self.started:
+            self._start_workers()
+        engine = thumbnail_engine_for(usd_file_path) if self.engine == 'auto' else self.engine
+        time_budget = thumbnail_time_budget(engine, self.time_budget)
+        process = self.idle_workers.get()
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            self._kill(process)
+
+        timer = threading.Timer(time_budget, kill) if time_budget else None
+        try:
+            self.job_counter += 1
+            job = {
+                'id': self.job_counter,
+                'usd_file_path': str(usd_file_path),
+                'resolution': list(self.resolution),
+                'engine': engine,
+                'time_budget': self.time_budget,
+            }
+            if timer:
+                timer.start()
+            process.stdin.write(json.dumps(job) + '\n')
+            process.stdin.flush()
+
+            for line in process.stdout:
+                if line.startswith(RENDER_RESULT_PREFIX):
+                    result = json.loads(line[len(RENDER_RESULT_PREFIX):])
+                    return base64.b64decode(result['thumbnail'])
+                # pass through whatever the worker and the renderer print
+                print(f"    [render worker {process.pid}] {line.rstrip()}")
+
+            raise RuntimeError(f"render worker exited with code {process.poll()}")
+        except Exception as e:
+            if timed_out.is_set():
+                print(f"    Thumbnail render of {usd_file_path} went over its {time_budget:g}s {engine} budget, skipped")
+            else:
+                print(f"    Error rendering thumbnail for {usd_file_path}: {e}")
+            return b''
+        finally:
+            if timer:
+                timer.cancel()
+            # the budget can run out just as the result comes in, so check for a killed worker either way
+            if timed_out.is_set():
+                process.wait()
+            if process.poll() is not None:
+                process = self._start_worker()
+            self.idle_workers.put(process)
+
+    def close(self):
+        for process in self.processes:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+        for process in self.processes:
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self._kill(process)
+        self.processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def render_worker_main():
+    """
+    Entry point for a ThumbnailRenderPool worker.
+
+    Reads one JSON job per line on stdin and replies with one RENDER_RESULT_PREFIX line per job.
+    """
+    # one render scene per worker, reused for every job (jobs from a pool share a resolution and budget)
+    renderers = {}
+    try:
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            job = json.loads(line)
+            resolution = tuple(job['resolution'])
+            time_budget = job.get('time_budget')
+            if (resolution, time_budget) not in renderers:
+                renderers[(resolution, time_budget)] = LazyThumbnailRenderer(resolution, time_budget=time_budget)
+            thumbnail_data = renderers[(resolution, time_budget)](job['usd_file_path'],
+                                                                  job.get('engine', DEFAULT_THUMBNAIL_ENGINE))
+            result = {
+                'id': job['id'],
+                'thumbnail': base64.b64encode(thumbnail_data).decode('ascii'),
+            }
+            sys.stdout.write(RENDER_RESULT_PREFIX + json.dumps(result) + '\n')
+            sys.stdout.flush()
+    finally:
+        for renderer in renderers.values():
+            renderer.close()
+
+
+def file_identity(file_path, content_hash=False):
+    """
+    Size and mtime of a file (and optionally a hash of its contents), as stored in gallery metadata.
+    """
+    stat = os.stat(file_path)
+    identity = {
+        'file_size': stat.st_size,
+        'file_mtime': int(stat.st_mtime),
+    }
+    if content_hash:
+        identity['content_hash'] = hash_file_contents(file_path)
+    return identity
+
+
+class AssetUpdater:
+    """
+    Works out which items already in the database are out of date with their files on disk, for
+    --update.
+
+    The stored file_size/file_mtime/content_hash metadata of every item in existing_index is read
+    in one pass up front, on the thread that creates the updater, since hou isn't thread safe and
+    the pipeline checks files from several threads. Callers pass only the items under the
+    directories being imported (see update_index), so unrelated libraries in the same database
+    cost nothing. A file is stale if its size changed, or its mtime changed (and, with
+    content_hash, its contents too, so a file that was only touched isn't re-imported). Items
+    imported before file_mtime was recorded are only compared on size.
+    """
+
+    def __init__(self, datasource, existing_index, content_hash=False):
+        self.existing_index = existing_index
+        self.content_hash = content_hash
+        self.stored = {}  # path -> stored identity metadata
+        self.identities = {}  # path -> current identity, filled in as files are checked
+        self.lock = threading.Lock()
+
+        print(f"Reading stored file metadata for {len(existing_index)} existing item(s)...")
+        for file_path, item_id in existing_index.items():
+            try:
+                metadata = datasource.metadata(item_id) or {}
+            except Exception as e:
+                print(f"WARNING: Failed to read metadata for {file_path}: {e}")
+                continue
+            self.stored[file_path] = {
+                key: metadata[key] for key in ('file_size', 'file_mtime', 'content_hash') if key in metadata
+            }
+
+    @staticmethod
+    def update_index(existing_index, directories):
+        """
+        The part of existing_index an AssetUpdater needs: items under any of directories (given
+        as they were scanned, they're also matched resolved).
+        """
+        prefixes = tuple({os.path.join(path, '') for directory in directories
+                          for path in (os.path.abspath(directory), os.path.realpath(directory))})
+        return {path: item_id for path, item_id in existing_index.items() if path.startswith(prefixes)}
+
+    def identity(self, file_path):
+        """
+        Current identity of a file on disk, worked out once per run.
+        """
+        with self.lock:
+            if file_path in self.identities:
+                return self.identities[file_path]
+        identity = file_identity(file_path, self.content_hash)
+        with self.lock:
+            self.identities[file_path] = identity
+        return identity
+
+    def is_stale(self, file_path):
+        """
+        Whether an existing item's file changed since it was imported.
+        """
+        stored = self.stored.get(file_path)
+        if stored is None:
+            return False
+
+        try:
+            current = self.identity(file_path)
+        except OSError:
+            # file is gone, nothing to refresh it from
+            return False
+
+        if 'file_size' in stored and stored['file_size'] != current['file_size']:
+            return True
+        if 'file_mtime' not in stored or stored['file_mtime'] == current['file_mtime']:
+            return False
+        if 'content_hash' in stored and 'content_hash' in current:
+            return stored['content_hash'] != current['content_hash']
+        return True
+
+
+def files_to_import(asset_info, existing_paths, import_variants=True, updater=None):
+    """
+    (usd_file, thumbnail) pairs of an asset that aren't in the database yet or, with an
+    AssetUpdater, are stale.
+    """
+    if not updater and asset_info.resolved_primary in existing_paths:
+        return []
+
+    files = [(asset_info.primary_file, asset_info.thumbnail)]
+    if import_variants:
+        files += asset_info.variants
+
+    to_import = []
+    for usd_file, thumbnail in files:
+        resolved_path = asset_info.resolved_path(usd_file)
+        if resolved_path in existing_paths and not (updater and updater.is_stale(resolved_path)):
+            continue
+        to_import.append((usd_file, thumbnail))
+    return to_import
+
+
+class ContentHashIndex(JsonSidecar):
+    """
+    Finds files being imported whose contents are identical to an earlier file's, for --dedupe, so
+    the same .usdc copied under several project folders isn't rendered (or imported) again.
+
+    Files are hashed a whole asset per thread, with xxh3 if xxhash is installed and blake2b
+    otherwise (both release the GIL while hashing). Hashes are cached in a JSON file next to the
+    database by path, checked against size and mtime, so only new or changed files are read. Files
+    already in the database are known from the cache of earlier --dedupe runs.
+
+    mark_duplicates gives each hash to the first file with it in import order, and records every
+    later file with the same hash in its AssetInfo.duplicates. Variant set layers name their primary
+    file by path, so copies of an asset never write the same layer, they're hashed as their primary
+    file's contents plus the variant they select instead. In 'link' mode duplicates are still
+    imported, with the first file's thumbnail, in 'skip' mode they're left out.
+    """
+
+    VERSION = 1
+    DESCRIPTION = 'content hash cache'
+
+    def __init__(self, mode='link', cache_path=None, workers=DEFAULT_SCAN_WORKERS, existing_index=None):
+        self.algorithm = 'xxh3_128' if xxhash else 'blake2b'
+        # hashes from another algorithm don't compare
+        super().__init__(cache_path, {'algorithm': self.algorithm})
+        self.mode = mode
+        self.workers = workers
+        self.existing_index = {}
+        self.entries = {}  # path -> {'identity': [size, mtime_ns], 'hash': hex digest}
+        self.first_files = {}  # hash -> resolved path of the first file with it
+        self.item_ids = {}  # resolved path -> id of items added this run, for linking thumbnails
+        self.lock = threading.Lock()
+        self.hashed = 0
+        self.duplicates = 0
+        self.duplicate_bytes = 0
+        self.load()
+        self.set_existing_index(existing_index or {})
+
+    def set_existing_index(self, existing_index):
+        """
+        Take the database's current path -> item id index, files in it that were hashed before count
+        as the first file with their contents.
+        """
+        self.existing_index = existing_index
+        with self.lock:
+            for path, entry in self.entries.items():
+                if path in existing_index:
+                    self.first_files.setdefault(entry['hash'], path)
+
+    def load(self):
+        data = self.read()
+        if data is not None:
+            self.entries = data.get('entries', {})
+            print(f"Loaded content hash cache with {len(self.entries)} files: {self.path}")
+
+    def hash(self, path):
+        """
+        (content hash, size) of a file, or None if it can't be read.
+        """
+        try:
+            stat = os.stat(path)
+            identity = [stat.st_size, stat.st_mtime_ns]
+            with self.lock:
+                entry = self.entries.get(path)
+            if entry and entry['identity'] == identity:
+                return (entry['hash'], stat.st_size)
+
+            with timings.stage('content_hash'):
+                content_hash = hash_file_contents(path, fast=True)
+        except OSError as e:
+            print(f"WARNING: Failed to hash {path}: {e}")
+            return None
+
+        with self.lock:
+            self.entries[path] = {'identity': identity, 'hash': content_hash}
+            self.hashed += 1
+        return (content_hash, stat.st_size)
+
+    def hash_selection(self, layer_path, source, selection):
+        """
+        (hash, 0) of a variant set layer, from its source file's hash and the variant it selects, or
+        None if the source can't be read. Kept in the cache so later runs know the layers already
+        in the database.
+        """
+        result = self.hash(source)
+        if result is None:
+            return None
+        key = f"{result[0]}\0{selection['usd_variant_set']}\0{selection['usd_variant']}"
+        content_hash = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+        with self.lock:
+            # no identity, the layer is rewritten whenever its source changes
+            self.entries[layer_path] = {'identity': None, 'hash': content_hash}
+        return (content_hash, 0)
+
+    def mark_duplicates(self, asset_infos, existing_paths, import_variants=True, updater=None):
+        """
+        Hash the files of each asset that an import would add (see files_to_import) and fill in
+        asset_info.duplicates, yields the assets in the order they came in.
+        """
+        def hash_asset(asset_info):
+            hashes = []
+            for usd_file, _ in files_to_import(asset_info, existing_paths, import_variants, updater):
+                path = asset_info.resolved_path(usd_file)
+                selection = asset_info.variant_selections.get(str(usd_file))
+                if selection:
+                    result = self.hash_selection(path, asset_info.resolved_primary, selection)
+                else:
+                    result = self.hash(path)
+                hashes.append((usd_file, path, result))
+            return (asset_info, hashes)
+
+        for asset_info, hashes in ordered_map(hash_asset, asset_infos, self.workers, thread_name_prefix='content_hash'):
+            for usd_file, path, result in hashes:
+                if result is None:
+                    continue
+                content_hash, size = result
+                first_file = self.first_files.setdefault(content_hash, path)
+                if first_file != path:
+                    asset_info.duplicates[str(usd_file)] = first_file
+                    self.duplicates += 1
+                    self.duplicate_bytes += size
+            yield asset_info
+
+    def thumbnail(self, datasource, path):
+        """
+        Thumbnail of the item for path, added this run or already in the database, or b''.
+        """
+        item_id = self.item_ids.get(path) or self.existing_index.get(path)
+        if not item_id:
+            return b''
+        try:
+            return datasource.thumbnail(item_id) or b''
+        except Exception as e:
+            print(f"WARNING: Failed to read the thumbnail of {path}: {e}")
+            return b''
+
+    def report(self):
+        print(f"  Duplicates ({self.mode}):     {self.duplicates} file(s), {format_size(self.duplicate_bytes)} "
+              f"duplicated, {self.hashed} file(s) hashed")
+
+    def save(self):
+        with self.lock:
+            self.write({'entries': self.entries})
+
+
+def prepare_asset_thumbnails(asset_info, existing_paths, import_variants=True, generate_thumbnails=True,
+                             renderer=None, cache=None, updater=None):
+    """
+    Load the thumbnails an import of this asset will need, ahead of the database writer.
+
+    Returns a dict of str(usd_file) -> image bytes for the primary file and variants that aren't
+    in the database yet (or, with an AssetUpdater, are stale). Thumbnails on disk and cache hits are
+    always loaded. Missing ones are only rendered here if a renderer that's safe to call from any
+    thread (a ThumbnailRenderPool) is given, otherwise they're left out of the dict for import_asset
+    to render. Duplicates found by ContentHashIndex are left for import_asset.
+    """
+    thumbnails = {}
+    for usd_file, thumbnail in files_to_import(asset_info, existing_paths, import_variants, updater):
+        if str(usd_file) in asset_info.duplicates:
+            continue
+        thumbnail_data = load_thumbnail(thumbnail)
+        if not thumbnail_data and generate_thumbnails:
+            if renderer:
+                # even if the render failed, don't let import_asset try again
+                thumbnails[str(usd_file)] = render_with_cache(usd_file, renderer, cache)
+                continue
+            elif cache:
+                key = cache.key(usd_file)
+                thumbnail_data = cache.get(key) if key else None
+
+        if thumbnail_data:
+            thumbnails[str(usd_file)] = thumbnail_data
+
+    return thumbnails
+
+
+def refresh_item(datasource, item_id, thumbnail_data, identity, extra_metadata=None):
+    """
+    Refresh an existing item's thumbnail and file metadata after its file was republished.
+    """
+    if thumbnail_data:
+        with timings.stage('set_thumbnail'):
+            datasource.setThumbnail(item_id, thumbnail_data)
+
+    metadata = dict(datasource.metadata(item_id) or {})
+    metadata.update(identity)
+    metadata.update(extra_metadata or {})
+    metadata['updated_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+    with timings.stage('set_metadata'):
+        datasource.setMetadata(item_id, metadata)
+
+
+def import_asset(datasource, asset_info, existing_paths, import_variants=True, generate_thumbnails=True, tags=None,
+                 thumbnail_renderer=None, thumbnail_cache=None, thumbnails=None, updater=None, usd_metadata=None,
+                 content_index=None, normalizer=None):
+    """
+    Import a single asset (and optionally its variants) into the database.
+
+    thumbnails holds image bytes already loaded by prepare_asset_thumbnails, keyed by str(usd_file).
+    Anything not in it goes through load_thumbnail, with thumbnail_renderer and thumbnail_cache,
+    and then the ThumbnailNormalizer if one is given.
+    usd_metadata holds UsdMetadataHarvester results, keyed the same way, stored with each item.
+    With a ContentHashIndex, files in asset_info.duplicates are skipped, or in 'link' mode imported
+    with the thumbnail of the item they duplicate.
+
+    Files already in the database are skipped, unless an AssetUpdater is given and reports them
+    stale, in which case the existing item is refreshed in place. With an updater, variants of an
+    existing asset are checked too (and new ones added).
+
+    Returns (success, failed, skipped, updated) counts.
+    """
+    success = 0
     failed = 0
     skipped = 0
+    updated = 0
+    # prepare_asset_thumbnails already tried the thumbnails on disk of everything but duplicates
+    prepared = thumbnails is not None
+    thumbnails = thumbnails or {}
+    usd_metadata = usd_metadata or {}
+
+    def normalize(thumbnail_data):
+        return normalizer.normalize(thumbnail_data) if normalizer and thumbnail_data else thumbnail_data
+
+    def get_thumbnail(usd_file, thumbnail):
+        if str(usd_file) in thumbnails:
+            return thumbnails[str(usd_file)]
+        duplicate_of = asset_info.duplicates.get(str(usd_file))
+        if content_index and duplicate_of:
+            # a thumbnail on disk still wins, but never render the same contents twice (the item's
+            # thumbnail was stored normalised already)
+            thumbnail_data = normalize(load_thumbnail(thumbnail)) or content_index.thumbnail(datasource, duplicate_of)
+            if thumbnail_data:
+                return thumbnail_data
+        elif prepared:
+            thumbnail = None
+        return normalize(load_thumbnail(
+            thumbnail,
+            generate_if_missing=generate_thumbnails,
+            usd_file_path=usd_file,
+            renderer=thumbnail_renderer,
+            cache=thumbnail_cache
+        ))
+
+    def get_identity(file_path):
+        return updater.identity(file_path) if updater else file_identity(file_path)
+
+    def skip_duplicate(usd_file):
+        return content_index and content_index.mode == 'skip' and str(usd_file) in asset_info.duplicates
+
+    def duplicate_metadata(usd_file):
+        duplicate_of = asset_info.duplicates.get(str(usd_file)) if content_index else None
+        return {'duplicate_of': duplicate_of} if duplicate_of else {}
+
+    # check if primary asset already exists
+    primary_path = asset_info.resolved_primary
+    if primary_path in existing_paths:
+        if updater and updater.is_stale(primary_path):
+            try:
+                refresh_item(
+                    datasource,
+                    updater.existing_index[primary_path],
+                    get_thumbnail(asset_info.primary_file, asset_info.thumbnail),
+                    get_identity(primary_path),
+                    dict(usd_metadata.get(str(asset_info.primary_file), {}),
+                         has_variants=len(asset_info.variants) > 0)
+                )
+                updated += 1
+                print(f"    Updated primary: {asset_info.name}")
+            except Exception as e:
+                failed += 1
+                print(f"    Error updating {asset_info.name}: {e}")
+                return (success, failed, skipped, updated)
+        else:
+            print(f"    Skipped primary: {asset_info.name}")
+            skipped += 1
+            # without --update, an existing primary means the whole asset was imported already
+            if not updater:
+                return (success, failed, skipped, updated)
+    elif skip_duplicate(asset_info.primary_file):
+        print(f"    Skipped duplicate primary: {asset_info.name} (same as {asset_info.duplicates[str(asset_info.primary_file)]})")
+        skipped += 1
+    else:
+        thumbnail_data = get_thumbnail(asset_info.primary_file, asset_info.thumbnail)
+
+        creation_date = int(os.path.getctime(primary_path))
+
+        # add primary asset to database
+        try:
+            with timings.stage('add_item'):
+                item_id = datasource.addItem(
+                    label=asset_info.name,
+                    file_path=primary_path,
+                    thumbnail=thumbnail_data,
+                    type_name='asset',
+                    blind_data=b'',
+                    creation_date=creation_date
+                )
+
+            if item_id:
+                metadata = dict(get_identity(primary_path))
+                metadata.update({
+                    'extension': asset_info.primary_file.suffix,
+                    'imported_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                    'has_variants': len(asset_info.variants) > 0
+                })
+                metadata.update(usd_metadata.get(str(asset_info.primary_file), {}))
+                metadata.update(duplicate_metadata(asset_info.primary_file))
+                if content_index:
+                    content_index.item_ids[primary_path] = item_id
+                with timings.stage('set_metadata'):
+                    datasource.setMetadata(item_id, metadata)
+
+                if tags:
+                    with timings.stage('add_tag'):
+                        for tag in tags:
+                            datasource.addTag(item_id, tag)
+
+                success += 1
+                print(f"    Imported primary: {asset_info.name}")
+            else:
+                failed += 1
+                print(f"    Failed to add primary: {asset_info.name}")
+                return (success, failed, skipped, updated)
+        except Exception as e:
+            failed += 1
+            print(f"    Error importing {asset_info.name}: {e}")
+            return (success, failed, skipped, updated)
+
+    # import variants if requested and available
+    if import_variants and asset_info.variants:
+        print(f"    Importing {len(asset_info.variants)} variant(s)...")
+        for variant_file, variant_thumbnail in asset_info.variants:
+            variant_path = asset_info.resolved_path(variant_file)
+            variant_name = variant_file.stem
 
-    # check if primary asset already exists
-    primary_path = str(asset_info.primary_file.resolve())
-    if primary_path in existing_paths:
-        print(f"    Skipped primary: {asset_info.name}")
-        skipped += 1
-        return (success, failed, skipped)
+            # check if variant already exists
+            if variant_path in existing_paths:
+                if updater and updater.is_stale(variant_path):
+                    try:
+                        refresh_item(
+                            datasource,
+                            updater.existing_index[variant_path],
+                            get_thumbnail(variant_file, variant_thumbnail),
+                            get_identity(variant_path),
+                            usd_metadata.get(str(variant_file))
+                        )
+                        updated += 1
+                        print(f"      Updated variant: {variant_name}")
+                    except Exception as e:
+                        failed += 1
+                        print(f"      Error updating variant {variant_name}: {e}")
+                    continue
+
+                print(f"      Skipped variant: {variant_name}")
+                skipped += 1
+                continue
+
+            if skip_duplicate(variant_file):
+                print(f"      Skipped duplicate variant: {variant_name} (same as {asset_info.duplicates[str(variant_file)]})")
+                skipped += 1
+                continue
+
+            variant_thumb_data = get_thumbnail(variant_file, variant_thumbnail)
+
+            variant_label = f"{asset_info.name} ({variant_name})" # generate variant label
+            variant_creation_date = int(os.path.getctime(variant_path))
+            try:
+                with timings.stage('add_item'):
+                    variant_id = datasource.addItem(
+                        label=variant_label,
+                        file_path=variant_path,
+                        thumbnail=variant_thumb_data,
+                        type_name='asset',
+                        blind_data=b'',
+                        creation_date=variant_creation_date
+                    )
+
+                if variant_id:
+                    variant_metadata = dict(get_identity(variant_path))
+                    variant_metadata.update({
+                        'extension': variant_file.suffix,
+                        'imported_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                        'is_variant': True,
+                        'parent_asset': asset_info.name
+                    })
+                    variant_metadata.update(usd_metadata.get(str(variant_file), {}))
+                    variant_metadata.update(duplicate_metadata(variant_file))
+                    if content_index:
+                        content_index.item_ids[variant_path] = variant_id
+                    with timings.stage('set_metadata'):
+                        datasource.setMetadata(variant_id, variant_metadata)
+
+                    if tags:
+                        with timings.stage('add_tag'):
+                            for tag in tags:
+                                datasource.addTag(variant_id, tag)
+
+                    success += 1
+                    print(f"      Imported variant: {variant_name}")
+                else:
+                    failed += 1
+                    print(f"      Failed to add variant: {variant_name}")
+            except Exception as e:
+                failed += 1
+                print(f"      Error importing variant {variant_name}: {e}")
+    return (success, failed, skipped, updated)
+
+
+def import_assets(assets_dir, database_path, import_variants=True, case_insensitive=True, generate_thumbnails=True, tags=None,
+                  scan_workers=DEFAULT_SCAN_WORKERS, incremental=False, manifest_path=None, thumbnail_workers=0,
+                  karma_threads=None, thumbnail_cache_dir=None, thumbnail_cache_size_gb=DEFAULT_THUMBNAIL_CACHE_SIZE_GB,
+                  thumbnail_cache_hash=False, commit_every=None, commit_interval=None, resume=True, update=False,
+                  update_hash=False, normalize_thumbnails=False, thumbnail_max_edge=DEFAULT_THUMBNAIL_MAX_EDGE,
+                  thumbnail_format='jpeg', thumbnail_quality=DEFAULT_THUMBNAIL_QUALITY, normalize_workers=None,
+                  report_path=None, prometheus_path=None, shard=None, max_depth=1, category_tags=False,
+                  usd_metadata=False, usd_metadata_workers=None, variant_sets=False, dedupe=None, dedupe_workers=None,
+                  thumbnail_engine=DEFAULT_THUMBNAIL_ENGINE, thumbnail_time_budget=None, usd_metadata_counts=False):
+    """
+    Import assets from one or more directories into an asset gallery database.
+
+    Several assets directories are scanned concurrently and written in one transaction, assets
+    reachable from more than one of them are only imported once (see iter_asset_roots).
+
+    Follows Houdini's component builder directory structure:
+    - Each asset directory contains a USD file matching the directory name
+    - Optional thumbnail.jpg or thumbnail.png in the asset directory
+    - Optional variants/ subdirectory with variant USD files and thumbnails
+
+    Args:
+        assets_dir: Path to directory containing asset subdirectories, or a list of them
+        database_path: Path to the asset gallery database file
+        import_variants: Whether to import variants from variants subdirectory (default: True)
+        case_insensitive: If True, perform case-insensitive matching for filenames (default: True)
+        generate_thumbnails: Whether to auto-generate thumbnails from USD if missing (default: True)
+        tags: Optional list of tags to apply to all imported assets
+        scan_workers: Number of threads used to scan asset directories, per assets directory
+            (default: DEFAULT_SCAN_WORKERS)
+        incremental: Skip asset directories that haven't changed since the last incremental run (default: False)
+        manifest_path: Scan manifest used by incremental runs (default: <database_path>.manifest.json)
+        thumbnail_workers: Render missing thumbnails on this many child hython processes while the database
+            is written, 0 renders them one at a time in this process (default: 0)
+        karma_threads: Threads per thumbnail worker (default: cpu_count / thumbnail_workers)
+        thumbnail_engine: One of THUMBNAIL_ENGINES, see ThumbnailRenderScene (default: DEFAULT_THUMBNAIL_ENGINE)
+        thumbnail_time_budget: Seconds a thumbnail render may take, only strictly enforced with
+            thumbnail_workers, rendering in this process it's Karma's time limit and previews have
+            none (default: DEFAULT_PREVIEW_TIME_BUDGET for previews, no limit otherwise)
+        thumbnail_cache_dir: Directory to cache generated thumbnails in, shared between runs (default: no cache)
+        thumbnail_cache_size_gb: Size cap of the thumbnail cache in GB (default: DEFAULT_THUMBNAIL_CACHE_SIZE_GB)
+        thumbnail_cache_hash: Key the thumbnail cache on file contents instead of path and mtime (default: False)
+        commit_every: Commit after every N assets instead of once at the end (default: None)
+        commit_interval: Commit once this many seconds have passed since the last commit (default: None)
+        resume: When committing in batches, resume an interrupted import from its checkpoint (default: True)
+        update: Refresh the thumbnail and metadata of existing items whose files changed on disk (default: False)
+        update_hash: With update, compare file contents as well as size and mtime (default: False)
+        normalize_thumbnails: Downscale and recompress thumbnails before storing them, needs Pillow (default: False)
+        thumbnail_max_edge: Longest edge of normalised thumbnails in pixels (default: DEFAULT_THUMBNAIL_MAX_EDGE)
+        thumbnail_format: 'jpeg' or 'webp', format of normalised thumbnails (default: 'jpeg')
+        thumbnail_quality: Encoder quality of normalised thumbnails (default: DEFAULT_THUMBNAIL_QUALITY)
+        normalize_workers: Processes used to normalise thumbnails (default: cpu_count)
+        report_path: Where to write the JSON timing report (default: <database_path>.report.json)
+        prometheus_path: Also write the timings as a Prometheus textfile here (default: None)
+        shard: (index, count) to only import that shard of the assets, for building partial databases
+            on several machines and combining them with merge_databases (default: None)
+        max_depth: Look for asset directories this many levels down, through category folders, 1 only
+            takes direct subdirectories (default: 1)
+        category_tags: Tag each asset with the category folders above it, with max_depth over 1 (default: False)
+        usd_metadata: Store the default prim, up axis, meters per unit and variant sets of each USD file
+            in its metadata, needs pxr (default: False)
+        usd_metadata_workers: Processes used to read USD metadata (default: cpu_count)
+        usd_metadata_counts: With usd_metadata, also store prim/mesh/face counts, which loads every
+            payload (default: False)
+        variant_sets: Also import each variant of the variant sets authored in an asset's primary file
+            as a variant, through layers written next to the database, needs pxr (default: False)
+        dedupe: 'link' to give files with the same contents as an earlier file that file's thumbnail
+            instead of rendering it again, 'skip' to not import them at all (default: None)
+        dedupe_workers: Threads used to hash files for dedupe (default: scan_workers)
+
+    Returns:
+        dict with 'success', 'failed', 'skipped', 'updated', 'total' counts, and the same counts per
+        assets directory under 'roots' (and 'duplicates' with dedupe)
+    """
+    print("\n" + "="*70)
+    print("Asset Catalogue Import Script")
+    print("="*70)
+
+    timings.reset()
+    roots = asset_roots(assets_dir)
+
+    # printing info at the end
+    stats = {
+        'success': 0,
+        'failed': 0,
+        'skipped': 0,
+        'updated': 0,
+        'total': 0
+    }
+    root_stats = {root: dict(stats) for root in roots}
+
+    datasource = create_or_open_database(database_path)
+    if not datasource:
+        return stats
+
+    if datasource.isReadOnly():
+        print("ERROR: Database is read-only. Cannot import assets.")
+        return stats
+
+    manifest = None
+    if incremental:
+        manifest = ScanManifest.load(
+            manifest_path or sidecar_path(database_path, 'manifest.json'),
+            options=ScanManifest.scan_options(import_variants, case_insensitive, max_depth)
+        )
+
+    # batched imports keep a checkpoint of the last committed asset so they can be resumed
+    checkpoint = None
+    if commit_every or commit_interval:
+        checkpoint = ImportCheckpoint(
+            sidecar_path(database_path, 'checkpoint.json'),
+            options={
+                'assets_dirs': roots,
+                'shard': list(shard) if shard else None,
+                'max_depth': max_depth,
+                'import_variants': import_variants,
+                'case_insensitive': case_insensitive,
+            }
+        )
+        if resume:
+            checkpoint = ImportCheckpoint.load(checkpoint.path, checkpoint.options)
+
+    existing_index = get_existing_asset_index(datasource, database_path)
+    existing_paths = existing_index.keys()
+    if manifest:
+        manifest.existing_paths = existing_paths
+
+    updater = None
+    if update:
+        # variant layers live next to the database, not under the roots
+        update_dirs = roots + ([sidecar_path(database_path, VARIANT_LAYERS_SUFFIX)] if variant_sets else [])
+        updater = AssetUpdater(datasource, AssetUpdater.update_index(existing_index, update_dirs),
+                               content_hash=update_hash)
+
+    content_index = None
+    if dedupe:
+        content_index = ContentHashIndex(dedupe, sidecar_path(database_path, 'content_hashes.json'),
+                                         dedupe_workers or scan_workers, existing_index)
+
+    thumbnail_cache = None
+    if generate_thumbnails and thumbnail_cache_dir:
+        thumbnail_cache = ThumbnailCache(
+            thumbnail_cache_dir,
+            max_bytes=int(thumbnail_cache_size_gb * 1024**3),
+            hash_contents=thumbnail_cache_hash,
+            settings=ThumbnailRenderScene.render_settings(engine=thumbnail_engine)
+        )
+
+    normalizer = None
+    if normalize_thumbnails:
+        normalizer = open_thumbnail_normalizer(database_path, thumbnail_max_edge, thumbnail_format, thumbnail_quality,
+                                               normalize_workers, thumbnail_cache_size_gb)
 
-    thumbnail_data = load_thumbnail(
-        asset_info.thumbnail,
-        generate_if_missing=generate_thumbnails,
-        usd_file_path=asset_info.primary_file
+    harvester = None
+    if usd_metadata:
+        harvester = open_usd_metadata_harvester(database_path, usd_metadata_workers, usd_metadata_counts)
+    variant_layers = open_variant_set_layers(database_path) if variant_sets and import_variants else None
+
+    # with a render pool, thumbnails are rendered by the thumbnail stage while the writer works,
+    # otherwise they have to be rendered in this process by the writer (hou isn't thread safe)
+    render_pool = None
+    local_renderer = None
+    if generate_thumbnails and thumbnail_workers > 0:
+        render_pool = ThumbnailRenderPool(thumbnail_workers, karma_threads, engine=thumbnail_engine,
+                                          time_budget=thumbnail_time_budget)
+    elif generate_thumbnails:
+        # reuse one render scene for every thumbnail rendered in this process
+        local_renderer = LazyThumbnailRenderer(engine=thumbnail_engine, time_budget=thumbnail_time_budget)
+
+    # streaming pipeline: scanner -> thumbnail stage -> database writer (this thread), joined by
+    # bounded queues so everything overlaps and memory stays flat however big the library is
+    def add_variants(asset_info):
+        if updater or asset_info.resolved_primary not in existing_paths:
+            variant_layers.add_variants(asset_info)
+        return asset_info
+
+    def prepare(asset_info):
+        with timings.stage('prepare', asset_info.timing_key):
+            thumbnails = prepare_asset_thumbnails(
+                asset_info, existing_paths, import_variants, generate_thumbnails,
+                render_pool.render if render_pool else None, thumbnail_cache, updater
+            )
+            if normalizer:
+                thumbnails = normalizer.normalize_all(thumbnails)
+            metadata = None
+            if harvester:
+                metadata = harvester.harvest_all(
+                    usd_file for usd_file, _ in files_to_import(asset_info, existing_paths, import_variants, updater)
+                )
+            if asset_info.variant_selections:
+                metadata = metadata or {}
+                for path, values in asset_info.variant_selections.items():
+                    metadata[path] = dict(metadata.get(path, {}), **values)
+        return (asset_info, thumbnails, metadata)
+
+    thumbnail_stage_workers = max(4, thumbnail_workers, normalizer.workers if normalizer else 0,
+                                  harvester.workers if harvester else 0)
+    scanned = stream_in_background(
+        iter_asset_roots(roots, case_insensitive, scan_workers, manifest,
+                         start_after=checkpoint.last_committed if checkpoint else None, shard=shard,
+                         max_depth=max_depth),
+        name='asset_scanner'
+    )
+    if variant_layers:
+        # before the hasher, so --dedupe sees the layers
+        scanned = stream_in_background(
+            ordered_map(add_variants, scanned, thumbnail_stage_workers, thread_name_prefix='variant_sets'),
+            name='variant_sets'
+        )
+    if content_index:
+        scanned = stream_in_background(
+            content_index.mark_duplicates(scanned, existing_paths, import_variants, updater),
+            name='asset_hasher'
+        )
+    prepared = stream_in_background(
+        ordered_map(prepare, scanned, thumbnail_stage_workers, thread_name_prefix='asset_thumbnails'),
+        name='asset_thumbnail_stage'
     )
 
-    creation_date = int(os.path.getctime(primary_path))
+    # import each asset
+    print("\nStarting import transaction...")
+    datasource.startTransaction()
+    batch_assets = 0
+    batch_started = time.monotonic()
+    committed_after = dict(checkpoint.last_committed) if checkpoint else {}
+    try:
+        for i, (asset_info, thumbnails, metadata) in enumerate(prepared, 1):
+            print(f"\n[{i}] Processing: {asset_info.name}")
+
+            with timings.stage('write', asset_info.timing_key):
+                s, f, sk, u = import_asset(datasource, asset_info, existing_paths, import_variants, generate_thumbnails,
+                                           (tags or []) + asset_info.categories if category_tags else tags, local_renderer,
+                                           thumbnail_cache, thumbnails, updater, metadata, content_index, normalizer)
+            for counts in (stats, root_stats[asset_info.root]):
+                counts['success'] += s
+                counts['failed'] += f
+                counts['skipped'] += sk
+                counts['updated'] += u
+                counts['total'] += 1
+            committed_after[asset_info.root] = asset_info.relative_path
+
+            if manifest:
+                if f == 0:
+                    # everything in the directory is in the database now, skip it until it changes
+                    usd_files = [asset_info.primary_file]
+                    if import_variants:
+                        usd_files += [variant_file for variant_file, _ in asset_info.variants]
+                    # skipped duplicates never reach the database, so they can't be checked against it
+                    imported = [
+                        asset_info.resolved_path(usd_file) for usd_file in usd_files
+                        if not (content_index and content_index.mode == 'skip' and str(usd_file) in asset_info.duplicates)
+                    ]
+                    manifest.record(asset_info.directory, asset_info.stamp, asset_info.file_paths(), imported)
+                else:
+                    # retry failures on the next run
+                    manifest.forget(asset_info.directory)
+
+            batch_assets += 1
+            if (commit_every and batch_assets >= commit_every) or \
+                    (commit_interval and time.monotonic() - batch_started >= commit_interval):
+                print(f"\nCommitting batch of {batch_assets} asset(s)...")
+                with timings.stage('commit'):
+                    datasource.endTransaction(commit=True)
+                if manifest:
+                    manifest.save()
+                checkpoint.save(committed_after)
+                datasource.startTransaction()
+                batch_assets = 0
+                batch_started = time.monotonic()
+
+        if stats['total'] == 0:
+            print("No assets found to import.")
+
+        # commit the transaction
+        print("\n" + "-"*70)
+        print("Committing transaction...")
+        with timings.stage('commit'):
+            datasource.endTransaction(commit=True)
+        print("Transaction committed successfully.")
+
+        # only record directories once they're committed
+        if manifest:
+            manifest.save()
+        if checkpoint:
+            checkpoint.clear()
+    except Exception as e:
+        # rollback on error
+        print(f"\nERROR during import: {e}")
+        print("Rolling back transaction...")
+        datasource.endTransaction(commit=False)
+        print("Transaction rolled back.")
+        if checkpoint:
+            for root, name in checkpoint.last_committed.items():
+                print(f"Assets in {root} up to '{name}' were committed, re-run to resume after it.")
+    finally:
+        prepared.close()
+        if render_pool:
+            render_pool.close()
+        if local_renderer:
+            local_renderer.close()
+        if normalizer:
+            normalizer.close()
+        if harvester:
+            harvester.close()
+        if content_index:
+            content_index.save()
+
+    # print summary
+    print("\n" + "="*70)
+    print("Import Summary")
+    print("="*70)
+    print(f"  Assets processed:      {stats['total']}")
+    print(f"  Successfully imported: {stats['success']}")
+    print(f"  Failed:                {stats['failed']}")
+    print(f"  Skipped (duplicates):  {stats['skipped']}")
+    if updater:
+        print(f"  Updated (changed):     {stats['updated']}")
+    if len(roots) > 1:
+        for root, counts in root_stats.items():
+            print(f"  {root}: {counts['total']} asset(s), {counts['success']} imported, {counts['failed']} failed, "
+                  f"{counts['skipped']} skipped" + (f", {counts['updated']} updated" if updater else ""))
+    if normalizer:
+        normalizer.report()
+    if harvester:
+        harvester.report()
+    if content_index:
+        content_index.report()
+        stats['duplicates'] = {'files': content_index.duplicates, 'bytes': content_index.duplicate_bytes}
+    summary = timings.summary(slowest=5)
+    print(f"  Wall time:             {summary['wall_time']:.1f}s")
+    for name, stage in summary['stages'].items():
+        print(f"    {name:<20} {stage['total']:>9.2f}s total  {stage['count']:>7} x  p90 {stage['p90'] * 1000:.1f}ms")
+    print("="*70 + "\n")
+
+    stats['roots'] = root_stats
+    timings.write_report(report_path or sidecar_path(database_path, 'report.json'), stats)
+    if prometheus_path:
+        timings.write_prometheus(prometheus_path, stats, database_path)
+
+    return stats
+
+
+def plan_import(assets_dir, database_path, import_variants=True, case_insensitive=True, generate_thumbnails=True,
+                scan_workers=DEFAULT_SCAN_WORKERS, incremental=False, manifest_path=None, thumbnail_cache_dir=None,
+                thumbnail_cache_hash=False, report_path=None, shard=None, max_depth=1,
+                thumbnail_engine=DEFAULT_THUMBNAIL_ENGINE):
+    """
+    Dry run of import_assets: scan, work out what an import would add and report it, without
+    writing to the database or needing hou. assets_dir can be a list, as for import_assets.
+
+    Existing items are read straight from the database's SQLite file (see get_existing_asset_index).
+    Files already in the database count as existing, whether or not --update would refresh them,
+    since that needs their stored metadata. Nothing is rendered, missing thumbnails are only counted
+    (thumbnail_engine only picks which cached thumbnails count).
+
+    Returns:
+        dict with 'new', 'existing', 'thumbnails_on_disk', 'thumbnails_cached', 'thumbnails_to_render',
+        'total' counts
+    """
+    print("\n" + "="*70)
+    print("Asset Catalogue Import Plan (dry run)")
+    print("="*70)
+
+    timings.reset()
+    plan = {
+        'new': 0,
+        'existing': 0,
+        'thumbnails_on_disk': 0,
+        'thumbnails_cached': 0,
+        'thumbnails_to_render': 0,
+        'total': 0
+    }
+
+    manifest = None
+    if incremental:
+        # read but never saved, so the next real run still sees these directories as changed
+        manifest = ScanManifest.load(
+            manifest_path or sidecar_path(database_path, 'manifest.json'),
+            options=ScanManifest.scan_options(import_variants, case_insensitive, max_depth)
+        )
+
+    existing_paths = get_existing_asset_index(None, database_path).keys()
+    print(f"  {len(existing_paths)} item(s) already in {database_path}")
+    if manifest:
+        manifest.existing_paths = existing_paths
+
+    thumbnail_cache = None
+    if generate_thumbnails and thumbnail_cache_dir and os.path.isdir(thumbnail_cache_dir):
+        thumbnail_cache = ThumbnailCache(thumbnail_cache_dir, hash_contents=thumbnail_cache_hash,
+                                         settings=ThumbnailRenderScene.render_settings(engine=thumbnail_engine))
+
+    for asset_info in iter_asset_roots(assets_dir, case_insensitive, scan_workers, manifest, shard=shard,
+                                       max_depth=max_depth):
+        plan['total'] += 1
+        files = [(asset_info.primary_file, asset_info.thumbnail)]
+        if import_variants:
+            files += asset_info.variants
+
+        new_files = 0
+        for usd_file, thumbnail in files:
+            if asset_info.resolved_path(usd_file) in existing_paths:
+                plan['existing'] += 1
+                continue
+
+            new_files += 1
+            if thumbnail:
+                plan['thumbnails_on_disk'] += 1
+            elif thumbnail_cache and thumbnail_cache.contains(usd_file):
+                plan['thumbnails_cached'] += 1
+            elif generate_thumbnails:
+                plan['thumbnails_to_render'] += 1
+
+        plan['new'] += new_files
+        if new_files:
+            print(f"  Would import: {asset_info.name} ({new_files} file(s))")
+
+    # print summary
+    print("\n" + "="*70)
+    print("Import Plan Summary")
+    print("="*70)
+    print(f"  Assets scanned:        {plan['total']}")
+    print(f"  Would import:          {plan['new']}")
+    print(f"  Already in database:   {plan['existing']}")
+    print(f"  Thumbnails on disk:    {plan['thumbnails_on_disk']}")
+    if thumbnail_cache:
+        print(f"  Thumbnails cached:     {plan['thumbnails_cached']}")
+    print(f"  Thumbnails to render:  {plan['thumbnails_to_render']}")
+    print("="*70 + "\n")
+
+    if report_path:
+        timings.write_report(report_path, plan)
+
+    return plan
+
+
+def prune_assets(assets_dir, database_path, case_insensitive=True, scan_workers=DEFAULT_SCAN_WORKERS, dry_run=False,
+                 max_depth=1):
+    """
+    Remove gallery items under assets_dir (one path or a list) whose files no longer exist.
+
+    The database's paths under assets_dir are diffed against a fresh scan with set operations, so
+    only paths the scan didn't find are checked on disk. An item is only removed when its file is
+    really gone, anything that exists but isn't part of the component builder layout is kept.
+    Variant layers (see VariantSetLayers) live next to the database rather than under assets_dir,
+    they're removed along with their files when the source file they were written for is gone
+    (working that out needs pxr, without it they're kept). All removals happen in one transaction.
+    A dry run reads the database's SQLite file directly and doesn't need hou.
+
+    Args:
+        assets_dir: Path to directory containing asset subdirectories, or a list of them
+        database_path: Path to the asset gallery database file
+        case_insensitive: If True, perform case-insensitive matching for filenames (default: True)
+        scan_workers: Number of threads used to scan asset directories (default: DEFAULT_SCAN_WORKERS)
+        dry_run: Only report the items that would be removed (default: False)
+        max_depth: Levels of category folders to look through, as for import_assets (default: 1)
+
+    Returns:
+        dict with 'orphaned', 'removed', 'kept' counts
+    """
+    print("\n" + "="*70)
+    print("Asset Catalogue Prune" + (" (dry run)" if dry_run else ""))
+    print("="*70)
+
+    stats = {
+        'orphaned': 0,
+        'removed': 0,
+        'kept': 0
+    }
+
+    datasource = None
+    if not dry_run:
+        datasource = create_or_open_database(database_path)
+        if not datasource:
+            return stats
+
+        if datasource.isReadOnly():
+            print("ERROR: Database is read-only. Cannot prune assets.")
+            return stats
+
+    roots = asset_roots(assets_dir)
+    for root in roots:
+        if not os.path.isdir(root):
+            # a missing root would make every item under it look orphaned, e.g. an unmounted share
+            print(f"ERROR: Assets directory does not exist: {root}")
+            return stats
+
+    existing_index = get_existing_asset_index(datasource, database_path)
+
+    # only items under these roots are ours to prune, the database may hold other libraries too
+    prefixes = tuple({os.path.join(path, '') for root in roots for path in (root, os.path.realpath(root))})
+    indexed = {path for path in existing_index if path.startswith(prefixes)}
+
+    scanned = set()
+    for asset_info in iter_asset_roots(roots, case_insensitive, scan_workers, max_depth=max_depth):
+        scanned.add(asset_info.resolved_primary)
+        scanned.update(asset_info.resolved_path(variant_file) for variant_file, _ in asset_info.variants)
+
+    # the scan is only a fast filter, confirm each candidate is really gone before removing it
+    candidates = indexed - scanned
+    orphans = sorted(path for path in candidates if not os.path.exists(path))
+    stats['kept'] = len(candidates) - len(orphans)
+
+    # variant layers whose source under these roots is gone, or whose own file is
+    layers_prefix = os.path.join(sidecar_path(database_path, VARIANT_LAYERS_SUFFIX), '')
+    orphaned_layers = []
+    for path in sorted(path for path in existing_index if path.startswith(layers_prefix)):
+        if not os.path.exists(path):
+            orphaned_layers.append(path)
+            continue
+        selection = read_variant_layer(path)
+        if selection and selection['source'].startswith(prefixes) and not os.path.exists(selection['source']):
+            orphaned_layers.append(path)
+    orphans += orphaned_layers
+    stats['orphaned'] = len(orphans)
+
+    print(f"\n{len(indexed)} item(s) under {', '.join(roots)}, {len(orphans)} with missing files")
+    for path in orphans:
+        print(f"  {'Would remove' if dry_run else 'Removing'}: {path}")
+
+    if orphans and not dry_run:
+        print("\nStarting prune transaction...")
+        datasource.startTransaction()
+        try:
+            datasource.markItemsForDeletion([existing_index[path] for path in orphans])
+            datasource.endTransaction(commit=True)
+            stats['removed'] = len(orphans)
+            print("Transaction committed successfully.")
+            for path in orphaned_layers:
+                try:
+                    os.remove(path)
+                    os.rmdir(os.path.dirname(path))  # only once the asset's last layer is gone
+                except OSError:
+                    pass
+        except Exception as e:
+            print(f"\nERROR during prune: {e}")
+            print("Rolling back transaction...")
+            datasource.endTransaction(commit=False)
+            print("Transaction rolled back.")
+
+    # print summary
+    print("\n" + "="*70)
+    print("Prune Summary")
+    print("="*70)
+    print(f"  Items under root:      {len(indexed)}")
+    print(f"  Missing files:         {stats['orphaned']}")
+    if orphaned_layers:
+        print(f"  Variant layers:        {len(orphaned_layers)}")
+    print(f"  Removed:               {stats['removed']}")
+    print(f"  Kept (still on disk):  {stats['kept']}")
+    print("="*70 + "\n")
+
+    return stats
+
+
+class InotifyWatcher:
+    """
+    Watches one or more assets directories with Linux inotify (through ctypes, no extra packages)
+    and reports which asset directories changed.
+
+    The assets directories, every asset directory and every variants/ directory get a watch, so
+    events name the asset they belong to without walking anything. Asset directories created
+    later are watched as they appear.
+    """
+
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    # close-write rather than modify, so a file being written only counts once it's finished
+    WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE |
+                  IN_DELETE_SELF | IN_MOVE_SELF)
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, assets_dir):
+        self.assets_dirs = [Path(root) for root in asset_roots(assets_dir)]
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.watches = {}  # watch descriptor -> (asset directory, is variants/)
+        self.root_watches = {}  # watch descriptor -> assets directory
+
+        for root in self.assets_dirs:
+            wd = self._add_watch(root, None, False)
+            if wd is not None:
+                del self.watches[wd]
+                self.root_watches[wd] = root
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        self._watch_asset(Path(entry.path))
+        print(f"Watching {len(self.watches) + len(self.root_watches)} directories with inotify")
+
+    def _add_watch(self, directory, asset_dir, is_variants):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), self.WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOENT:
+                return None
+            # ENOSPC means fs.inotify.max_user_watches is too low for this library
+            raise OSError(error, f"inotify_add_watch failed for {directory}: {os.strerror(error)}")
+        self.watches[wd] = (asset_dir, is_variants)
+        return wd
+
+    def _watch_asset(self, asset_dir):
+        self._add_watch(asset_dir, asset_dir, False)
+        if os.path.isdir(asset_dir / 'variants'):
+            self._add_watch(asset_dir / 'variants', asset_dir, True)
+
+    def wait(self, timeout=None):
+        """
+        Wait up to timeout seconds (forever if None) for events, returns the set of asset
+        directories that changed.
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, name_length = self.EVENT_HEADER.unpack_from(data, offset)
+                offset += self.EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + name_length].rstrip(b'\0'))
+                offset += name_length
+
+                if mask & self.IN_Q_OVERFLOW:
+                    # events were dropped, so anything could have changed
+                    for root in self.assets_dirs:
+                        with os.scandir(root) as entries:
+                            changed.update(Path(entry.path) for entry in entries if entry.is_dir())
+                    continue
+                if mask & self.IN_IGNORED:
+                    self.watches.pop(wd, None)
+                    self.root_watches.pop(wd, None)
+                    continue
+
+                created = mask & (self.IN_CREATE | self.IN_MOVED_TO) and mask & self.IN_ISDIR
+                if wd in self.root_watches:
+                    # a child of an assets directory, i.e. an asset directory itself
+                    if not name:
+                        continue
+                    asset_dir = self.root_watches[wd] / name
+                    if created:
+                        self._watch_asset(asset_dir)
+                    changed.add(asset_dir)
+                    continue
+                if wd not in self.watches:
+                    continue
+
+                asset_dir, is_variants = self.watches[wd]
+                if created and not is_variants and name == 'variants':
+                    self._add_watch(asset_dir / 'variants', asset_dir, True)
+                changed.add(asset_dir)
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """
+    Stand-in for InotifyWatcher where inotify isn't available (macOS, Windows, or too few inotify
+    watches). Polls the ScanManifest stamp of every asset directory, so like --incremental it sees
+    files being added, removed or renamed, but not files overwritten in place.
+    """
+
+    def __init__(self, assets_dir, interval=DEFAULT_WATCH_POLL_INTERVAL, workers=DEFAULT_SCAN_WORKERS):
+        self.assets_dirs = [Path(root) for root in asset_roots(assets_dir)]
+        self.interval = interval
+        self.workers = workers
+        self.stamps = self._stamps()
+        print(f"Polling {len(self.stamps)} asset directories every {interval:g}s")
+
+    def _stamps(self):
+        subdirs = []
+        for root in self.assets_dirs:
+            with os.scandir(root) as entries:
+                subdirs += [Path(entry.path) for entry in entries if entry.is_dir()]
+
+        def stamp(asset_dir):
+            try:
+                return (asset_dir, ScanManifest.directory_stamp(asset_dir))
+            except OSError:
+                return (asset_dir, None)
+
+        return dict(ordered_map(stamp, subdirs, max(1, min(self.workers, len(subdirs))),
+                                thread_name_prefix='asset_poll'))
+
+    def wait(self, timeout=None):
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        stamps = self._stamps()
+        changed = {asset_dir for asset_dir in stamps.keys() | self.stamps.keys()
+                   if stamps.get(asset_dir) != self.stamps.get(asset_dir)}
+        self.stamps = stamps
+        return changed
+
+    def close(self):
+        pass
+
+
+def open_watcher(assets_dir, poll_interval=DEFAULT_WATCH_POLL_INTERVAL, workers=DEFAULT_SCAN_WORKERS):
+    """
+    An InotifyWatcher for assets_dir, or a PollingWatcher if inotify can't be used.
+    """
+    if sys.platform.startswith('linux'):
+        watcher = None
+        try:
+            watcher = InotifyWatcher(assets_dir)
+            return watcher
+        except (OSError, AttributeError) as e:
+            if watcher:
+                watcher.close()
+            print(f"WARNING: inotify unavailable ({e}), falling back to polling")
+    return PollingWatcher(assets_dir, poll_interval, workers)
+
+
+def import_changed_assets(datasource, database_path, asset_dirs, import_variants=True, case_insensitive=True,
+                          generate_thumbnails=True, tags=None, thumbnail_renderer=None, thumbnail_cache=None,
+                          update=False, update_hash=False, scan_workers=DEFAULT_SCAN_WORKERS, normalizer=None,
+                          harvester=None, variant_layers=None, dedupe=None):
+    """
+    Rescan a batch of asset directories and import them in one transaction, for --watch.
+
+    Only the given directories are scanned. With update, only the stored metadata of items under
+    them is read. Directories that were deleted or aren't assets are ignored. Thumbnails go through
+    the ThumbnailNormalizer, USD metadata is read by the UsdMetadataHarvester, variant sets are
+    added by VariantSetLayers and duplicates are handled with dedupe, a ContentHashIndex, if they're
+    given.
+
+    Returns dict with 'success', 'failed', 'skipped', 'updated' counts.
+    """
+    stats = {'success': 0, 'failed': 0, 'skipped': 0, 'updated': 0, 'total': 0}
+
+    asset_dirs = sorted(asset_dirs, key=lambda item: (item.name, str(item)))
+    workers = max(1, min(scan_workers, len(asset_dirs)))
+    asset_infos = {}
+    for asset_info in ordered_map(lambda item: scan_asset_directory(item, case_insensitive) if item.is_dir() else None,
+                                  asset_dirs, workers, thread_name_prefix='asset_scan'):
+        # the same asset can show up under two watched roots
+        if asset_info:
+            asset_infos.setdefault(asset_info.resolved_primary, asset_info)
+    asset_infos = list(asset_infos.values())
+    if not asset_infos:
+        return stats
+
+    existing_index = get_existing_asset_index(datasource, database_path)
+    existing_paths = existing_index.keys()
+
+    updater = None
+    if update:
+        update_dirs = [asset_info.directory for asset_info in asset_infos]
+        if variant_layers:
+            update_dirs.append(variant_layers.directory)
+        updater = AssetUpdater(datasource, AssetUpdater.update_index(existing_index, update_dirs),
+                               content_hash=update_hash)
+
+    if variant_layers:
+        for asset_info in asset_infos:
+            if updater or asset_info.resolved_primary not in existing_paths:
+                variant_layers.add_variants(asset_info)
+
+    if dedupe:
+        dedupe.set_existing_index(existing_index)
+        asset_infos = list(dedupe.mark_duplicates(asset_infos, existing_paths, import_variants, updater))
+
+    datasource.startTransaction()
+    try:
+        for asset_info in asset_infos:
+            print(f"\n  Processing: {asset_info.name}")
+            thumbnails = None
+            if normalizer:
+                thumbnails = normalizer.normalize_all(prepare_asset_thumbnails(
+                    asset_info, existing_paths, import_variants, generate_thumbnails, None, thumbnail_cache, updater
+                ))
+            metadata = None
+            if harvester:
+                metadata = harvester.harvest_all(
+                    usd_file for usd_file, _ in files_to_import(asset_info, existing_paths, import_variants, updater)
+                )
+            if asset_info.variant_selections:
+                metadata = metadata or {}
+                for path, values in asset_info.variant_selections.items():
+                    metadata[path] = dict(metadata.get(path, {}), **values)
+            s, f, sk, u = import_asset(datasource, asset_info, existing_paths, import_variants, generate_thumbnails,
+                                       tags, thumbnail_renderer, thumbnail_cache, thumbnails, updater, metadata,
+                                       dedupe, normalizer)
+            stats['success'] += s
+            stats['failed'] += f
+            stats['skipped'] += sk
+            stats['updated'] += u
+            stats['total'] += 1
+        datasource.endTransaction(commit=True)
+    except Exception as e:
+        print(f"\nERROR during import: {e}")
+        print("Rolling back transaction...")
+        datasource.endTransaction(commit=False)
+        print("Transaction rolled back.")
+
+    return stats
 
-    # add primary asset to database
-    try:
-        item_id = datasource.addItem(
-            label=asset_info.name,
-            file_path=primary_path,
-            thumbnail=thumbnail_data,
-            type_name='asset',
-            blind_data=b'',
-            creation_date=creation_date
-        )
 
-        if item_id:
-            metadata = {
-                'file_size': os.path.getsize(primary_path),
-                'extension': asset_info.primary_file.suffix,
-                'imported_at': time.strftime('%Y-%m-%d %H:%M:%S'),
-                'has_variants': len(asset_info.variants) > 0
-            }
-            datasource.setMetadata(item_id, metadata)
+def watch_assets(assets_dir, database_path, import_variants=True, case_insensitive=True, generate_thumbnails=True,
+                 tags=None, thumbnail_cache_dir=None, thumbnail_cache_size_gb=DEFAULT_THUMBNAIL_CACHE_SIZE_GB,
+                 thumbnail_cache_hash=False, update=False, update_hash=False, debounce=DEFAULT_WATCH_DEBOUNCE,
+                 max_delay=DEFAULT_WATCH_MAX_DELAY, poll_interval=DEFAULT_WATCH_POLL_INTERVAL,
+                 scan_workers=DEFAULT_SCAN_WORKERS, normalize_thumbnails=False,
+                 thumbnail_max_edge=DEFAULT_THUMBNAIL_MAX_EDGE, thumbnail_format='jpeg',
+                 thumbnail_quality=DEFAULT_THUMBNAIL_QUALITY, normalize_workers=None, usd_metadata=False,
+                 usd_metadata_workers=None, variant_sets=False, dedupe=None, dedupe_workers=None,
+                 thumbnail_engine=DEFAULT_THUMBNAIL_ENGINE, thumbnail_time_budget=None, usd_metadata_counts=False):
+    """
+    Keep importing asset directories as they change, until interrupted.
 
-            if tags:
-                for tag in tags:
-                    datasource.addTag(item_id, tag)
+    Changed asset directories are collected until the assets directory has been quiet for debounce
+    seconds (or max_delay seconds have passed since the first change, so a steady trickle still
+    gets imported), then only those directories are rescanned and imported in one transaction.
+    A publish that writes hundreds of files becomes one batch.
 
-            success += 1
-            print(f"    Imported primary: {asset_info.name}")
-        else:
-            failed += 1
-            print(f"    Failed to add primary: {asset_info.name}")
-            return (success, failed, skipped)
-    except Exception as e:
-        failed += 1
-        print(f"    Error importing {asset_info.name}: {e}")
-        return (success, failed, skipped)
+    Args:
+        assets_dir: Path to directory containing asset subdirectories, or a list of them
+        database_path: Path to the asset gallery database file
+        import_variants, case_insensitive, generate_thumbnails, tags: As for import_assets
+        thumbnail_cache_dir, thumbnail_cache_size_gb, thumbnail_cache_hash: As for import_assets
+        update, update_hash: As for import_assets, so republished files get refreshed
+        debounce: Seconds without events before a batch is imported (default: DEFAULT_WATCH_DEBOUNCE)
+        max_delay: Most seconds a change waits before being imported (default: DEFAULT_WATCH_MAX_DELAY)
+        poll_interval: Seconds between polls when inotify isn't available (default: DEFAULT_WATCH_POLL_INTERVAL)
+        scan_workers: Number of threads used to scan asset directories (default: DEFAULT_SCAN_WORKERS)
+        normalize_thumbnails, thumbnail_max_edge, thumbnail_format, thumbnail_quality, normalize_workers:
+            As for import_assets
+        usd_metadata, usd_metadata_workers, variant_sets, dedupe, dedupe_workers: As for import_assets
+        thumbnail_engine, thumbnail_time_budget, usd_metadata_counts: As for import_assets
+    """
+    print("\n" + "="*70)
+    print("Asset Catalogue Watch")
+    print("="*70)
 
-    # import variants if requested and available
-    if import_variants and asset_info.variants:
-        print(f"    Importing {len(asset_info.variants)} variant(s)...")
-        for variant_file, variant_thumbnail in asset_info.variants:
-            variant_path = str(variant_file.resolve())
-            variant_name = variant_file.stem
+    roots = asset_roots(assets_dir)
+    for root in roots:
+        if not os.path.isdir(root):
+            print(f"ERROR: Assets directory does not exist: {root}")
+            return
 
-            # check if variant already exists
-            if variant_path in existing_paths:
-                print(f"      Skipped variant: {variant_name}")
-                skipped += 1
-                continue
+    datasource = create_or_open_database(database_path)
+    if not datasource:
+        return
 
-            variant_thumb_data = load_thumbnail(
-                variant_thumbnail,
-                generate_if_missing=generate_thumbnails,
-                usd_file_path=variant_file
-            )
+    if datasource.isReadOnly():
+        print("ERROR: Database is read-only. Cannot import assets.")
+        return
 
-            variant_label = f"{asset_info.name} ({variant_name})" # generate variant label
-            variant_creation_date = int(os.path.getctime(variant_path))
-            try:
-                variant_id = datasource.addItem(
-                    label=variant_label,
-                    file_path=variant_path,
-                    thumbnail=variant_thumb_data,
-                    type_name='asset',
-                    blind_data=b'',
-                    creation_date=variant_creation_date
-                )
+    thumbnail_cache = None
+    if generate_thumbnails and thumbnail_cache_dir:
+        thumbnail_cache = ThumbnailCache(
+            thumbnail_cache_dir,
+            max_bytes=int(thumbnail_cache_size_gb * 1024**3),
+            hash_contents=thumbnail_cache_hash,
+            settings=ThumbnailRenderScene.render_settings(engine=thumbnail_engine)
+        )
+    normalizer = None
+    if normalize_thumbnails:
+        normalizer = open_thumbnail_normalizer(database_path, thumbnail_max_edge, thumbnail_format, thumbnail_quality,
+                                               normalize_workers, thumbnail_cache_size_gb)
+    harvester = None
+    if usd_metadata:
+        harvester = open_usd_metadata_harvester(database_path, usd_metadata_workers, usd_metadata_counts)
+    variant_layers = open_variant_set_layers(database_path) if variant_sets and import_variants else None
+    content_index = None
+    if dedupe:
+        content_index = ContentHashIndex(dedupe, sidecar_path(database_path, 'content_hashes.json'),
+                                         dedupe_workers or scan_workers)
+    # one render scene for the whole session
+    renderer = LazyThumbnailRenderer(engine=thumbnail_engine, time_budget=thumbnail_time_budget) \
+        if generate_thumbnails else None
 
-                if variant_id:
-                    variant_metadata = {
-                        'file_size': os.path.getsize(variant_path),
-                        'extension': variant_file.suffix,
-                        'imported_at': time.strftime('%Y-%m-%d %H:%M:%S'),
-                        'is_variant': True,
-                        'parent_asset': asset_info.name
-                    }
-                    datasource.setMetadata(variant_id, variant_metadata)
+    watcher = open_watcher(roots, poll_interval, scan_workers)
+    pending = set()
+    first_change = None
+    last_change = None
+    print(f"Waiting for changes in {', '.join(roots)} (Ctrl+C to stop)...")
+    try:
+        while True:
+            timeout = None
+            if pending:
+                now = time.monotonic()
+                timeout = max(0.0, min(last_change + debounce, first_change + max_delay) - now)
 
-                    if tags:
-                        for tag in tags:
-                            datasource.addTag(variant_id, tag)
+            changed = watcher.wait(timeout)
+            now = time.monotonic()
+            if changed:
+                pending.update(changed)
+                last_change = now
+                if first_change is None:
+                    first_change = now
 
-                    success += 1
-                    print(f"      Imported variant: {variant_name}")
-                else:
-                    failed += 1
-                    print(f"      Failed to add variant: {variant_name}")
-            except Exception as e:
-                failed += 1
-                print(f"      Error importing variant {variant_name}: {e}")
-    return (success, failed, skipped)
+            if pending and (now - last_change >= debounce or now - first_change >= max_delay):
+                batch = pending
+                pending = set()
+                first_change = None
+                print(f"\n[{time.strftime('%H:%M:%S')}] Importing {len(batch)} changed asset directories...")
+                stats = import_changed_assets(
+                    datasource, database_path, batch, import_variants, case_insensitive, generate_thumbnails,
+                    tags, renderer, thumbnail_cache, update, update_hash, scan_workers, normalizer, harvester,
+                    variant_layers, content_index
+                )
+                if harvester:
+                    harvester.save()
+                if content_index:
+                    content_index.save()
+                print(f"  Imported {stats['success']}, updated {stats['updated']}, "
+                      f"skipped {stats['skipped']}, failed {stats['failed']}")
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        watcher.close()
+        if renderer:
+            renderer.close()
+        if normalizer:
+            normalizer.report()
+            normalizer.close()
+        if harvester:
+            harvester.report()
+            harvester.close()
+        if content_index:
+            content_index.report()
 
 
-def import_assets(assets_dir, database_path, import_variants=True, case_insensitive=True, generate_thumbnails=True, tags=None):
+def merge_databases(database_path, shard_paths):
     """
-    Import assets from a directory into an asset gallery database.
+    Combine asset gallery databases built by sharded imports (see import_assets' shard) into one.
 
-    Follows Houdini's component builder directory structure:
-    - Each asset directory contains a USD file matching the directory name
-    - Optional thumbnail.jpg or thumbnail.png in the asset directory
-    - Optional variants/ subdirectory with variant USD files and thumbnails
+    Every item of every shard whose file path isn't in the target database yet (or in an earlier
+    shard) is copied over with its label, thumbnail, type, blind data, creation date, metadata and
+    tags. Everything is written in one transaction.
+
+    Variant layers (see VariantSetLayers) are written next to the database that was imported into,
+    so items pointing at a shard's layers are moved over to the target's: each layer is copied into
+    <database_path>.variant_layers from where the shard recorded it or, if that path isn't on this
+    machine, from the .variant_layers folder copied next to the shard database. Layers found in
+    neither place aren't merged, re-import with --variant-sets --update to write them again.
 
     Args:
-        assets_dir: Path to directory containing asset subdirectories
-        database_path: Path to the asset gallery database file
-        import_variants: Whether to import variants from variants subdirectory (default: True)
-        case_insensitive: If True, perform case-insensitive matching for filenames (default: True)
-        generate_thumbnails: Whether to auto-generate thumbnails from USD if missing (default: True)
-        tags: Optional list of tags to apply to all imported assets
+        database_path: Path to the asset gallery database to merge into, created if missing
+        shard_paths: Paths to the shard databases
 
     Returns:
-        dict with 'success', 'failed', 'skipped' counts
+        dict with 'merged', 'skipped', 'failed' counts
     """
     print("\n" + "="*70)
-    print("Asset Catalogue Import Script")
+    print("Asset Catalogue Merge")
     print("="*70)
 
-    # printing info at the end
     stats = {
-        'success': 0,
-        'failed': 0,
+        'merged': 0,
         'skipped': 0,
-        'total': 0
+        'failed': 0
     }
 
+    target_path = os.path.abspath(database_path)
+    for shard_path in shard_paths:
+        if not os.path.isfile(shard_path):
+            print(f"ERROR: Shard database does not exist: {shard_path}")
+            return stats
+        if os.path.abspath(shard_path) == target_path:
+            print(f"ERROR: Can't merge a database into itself: {shard_path}")
+            return stats
+
     datasource = create_or_open_database(database_path)
     if not datasource:
         return stats
 
     if datasource.isReadOnly():
-        print("ERROR: Database is read-only. Cannot import assets.")
+        print("ERROR: Database is read-only. Cannot merge into it.")
         return stats
 
-    # scan assets
-    assets = scan_assets_directory(assets_dir, case_insensitive)
-    if not assets:
-        print("No assets found to import.")
-        return stats
-    existing_paths = get_existing_asset_paths(datasource)
+    # dedupe on file path, against the target and across shards
+    seen_paths = set(get_existing_asset_index(datasource, database_path))
+    target_layers = Path(sidecar_path(database_path, VARIANT_LAYERS_SUFFIX))
 
-    # import each asset
-    print("\nStarting import transaction...")
+    def relocate_variant_layer(file_path, shard_path):
+        """
+        Copy a shard's variant layer next to the target database, returns its new path, None if
+        the layer can't be found, or file_path unchanged for any other file.
+        """
+        layer_path = Path(file_path)
+        if not layer_path.parent.parent.name.endswith('.' + VARIANT_LAYERS_SUFFIX):
+            return file_path
+        relative = Path(layer_path.parent.name) / layer_path.name
+        new_path = target_layers / relative
+        for candidate in (layer_path, Path(sidecar_path(shard_path, VARIANT_LAYERS_SUFFIX)) / relative):
+            try:
+                with open(candidate, 'r') as f:
+                    text = f.read()
+            except OSError:
+                continue
+            if candidate != new_path:
+                new_path.parent.mkdir(parents=True, exist_ok=True)
+                write_atomic(new_path, text)
+            return str(new_path)
+        return None
+
+    print("\nStarting merge transaction...")
     datasource.startTransaction()
     try:
-        
-        for i, asset_info in enumerate(assets, 1):
-            print(f"\n[{i}/{len(assets)}] Processing: {asset_info.name}")
+        for shard_path in shard_paths:
+            shard = hou.AssetGalleryDataSource(os.path.abspath(shard_path))
+            if not shard.isValid():
+                print(f"ERROR: Failed to open shard database: {shard_path}")
+                stats['failed'] += 1
+                continue
 
-            s, f, sk = import_asset(datasource, asset_info, existing_paths, import_variants, generate_thumbnails, tags)
-            stats['success'] += s
-            stats['failed'] += f
-            stats['skipped'] += sk
-            stats['total'] += 1
+            merged = 0
+            skipped = 0
+            for item_id in shard.itemIds():
+                file_path = shard.filePath(item_id)
+                if file_path:
+                    try:
+                        file_path = relocate_variant_layer(file_path, shard_path)
+                    except OSError as e:
+                        print(f"    Error copying variant layer {shard.filePath(item_id)}: {e}")
+                        stats['failed'] += 1
+                        continue
+                    if file_path is None:
+                        print(f"    Variant layer not found, not merged: {shard.filePath(item_id)}")
+                        stats['failed'] += 1
+                        continue
+                abs_path = os.path.abspath(file_path) if file_path else None
+                if abs_path and abs_path in seen_paths:
+                    skipped += 1
+                    continue
+
+                try:
+                    with timings.stage('add_item'):
+                        new_id = datasource.addItem(
+                            label=shard.label(item_id),
+                            file_path=file_path,
+                            thumbnail=shard.thumbnail(item_id),
+                            type_name=shard.typeName(item_id),
+                            blind_data=shard.blindData(item_id),
+                            creation_date=shard.creationDate(item_id)
+                        )
+                    if not new_id:
+                        print(f"    Failed to add {file_path}")
+                        stats['failed'] += 1
+                        continue
+
+                    metadata = shard.metadata(item_id)
+                    if metadata:
+                        with timings.stage('set_metadata'):
+                            datasource.setMetadata(new_id, metadata)
+                    for tag in shard.tags(item_id):
+                        datasource.addTag(new_id, tag)
+                except Exception as e:
+                    print(f"    Error merging {file_path}: {e}")
+                    stats['failed'] += 1
+                    continue
+
+                if abs_path:
+                    seen_paths.add(abs_path)
+                merged += 1
+
+            stats['merged'] += merged
+            stats['skipped'] += skipped
+            print(f"  {shard_path}: {merged} merged, {skipped} already present")
 
-        # commit the transaction
-        print("\n" + "-"*70)
         print("Committing transaction...")
-        datasource.endTransaction(commit=True)
+        with timings.stage('commit'):
+            datasource.endTransaction(commit=True)
         print("Transaction committed successfully.")
     except Exception as e:
-        # rollback on error
-        print(f"\nERROR during import: {e}")
+        print(f"\nERROR during merge: {e}")
         print("Rolling back transaction...")
         datasource.endTransaction(commit=False)
         print("Transaction rolled back.")
 
     # print summary
     print("\n" + "="*70)
-    print("Import Summary")
+    print("Merge Summary")
     print("="*70)
-    print(f"  Assets processed:      {stats['total']}")
-    print(f"  Successfully imported: {stats['success']}")
-    print(f"  Failed:                {stats['failed']}")
+    print(f"  Shards:                {len(shard_paths)}")
+    print(f"  Merged:                {stats['merged']}")
     print(f"  Skipped (duplicates):  {stats['skipped']}")
+    print(f"  Failed:                {stats['failed']}")
     print("="*70 + "\n")
 
     return stats
 
 
+def parse_shard(value):
+    """
+    argparse type for --shard i/N.
+    """
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got '{value}'")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be from 0 to N-1, got '{value}'")
+    return (index, count)
+
+
 def main():
     """Command-line interface for the import script."""
     parser = argparse.ArgumentParser(
@@ -591,12 +4164,37 @@ Expected directory structure:
         variant_name.usd[c|a]
         variant_name_thumbnail.jpg|png
 
+With --recursive, asset directories can sit under category folders:
+  assets/
+    props/
+      furniture/
+        asset_name/
+          asset_name.usd[c|a]
+
 Examples (Unix/Linux/macOS):
   hython importassetcatalogue.py /path/to/assets /path/to/my_assets.db
   hython importassetcatalogue.py /path/to/assets /path/to/my_assets.db --no-variants
   hython importassetcatalogue.py /path/to/assets /path/to/my_assets.db --no-generate-thumbnails
   hython importassetcatalogue.py /path/to/assets /path/to/my_assets.db --case-sensitive
   hython importassetcatalogue.py /path/to/assets /path/to/my_assets.db --tags environment,props
+  hython importassetcatalogue.py /path/to/assets /path/to/my_assets.db --scan-workers 64
+  hython importassetcatalogue.py /path/to/assets /path/to/my_assets.db --recursive --max-depth 4 --category-tags
+  hython importassetcatalogue.py /path/to/assets /path/to/my_assets.db --incremental
+  hython importassetcatalogue.py /path/to/assets /path/to/my_assets.db --thumbnail-workers 4 --karma-threads 8
+  hython importassetcatalogue.py /path/to/assets /path/to/my_assets.db --thumbnail-workers 8 --thumbnail-engine auto
+  hython importassetcatalogue.py /path/to/assets /path/to/my_assets.db --thumbnail-cache /scratch/thumbnail_cache
+  hython importassetcatalogue.py /path/to/assets /path/to/my_assets.db --commit-every 500 --commit-interval 600
+  hython importassetcatalogue.py /path/to/assets /path/to/my_assets.db --update
+  hython importassetcatalogue.py /vol/props /vol/environments /vol/vendor_kits /path/to/my_assets.db
+  hython importassetcatalogue.py /path/to/assets /scratch/shard_3.db --shard 3/8
+  hython importassetcatalogue.py merge /path/to/my_assets.db /scratch/shard_*.db
+  hython importassetcatalogue.py /path/to/assets /path/to/my_assets.db --prometheus-textfile /var/lib/node_exporter/asset_catalogue.prom
+  hython importassetcatalogue.py /path/to/assets /path/to/my_assets.db --normalize-thumbnails --thumbnail-format webp
+  hython importassetcatalogue.py /path/to/assets /path/to/my_assets.db --usd-metadata --update
+  hython importassetcatalogue.py /path/to/assets /path/to/my_assets.db --variant-sets --thumbnail-workers 4
+  hython importassetcatalogue.py /vol/show_a/assets /vol/show_b/assets /path/to/my_assets.db --dedupe link
+  python importassetcatalogue.py /path/to/assets /path/to/my_assets.db --dry-run --prune
+  hython importassetcatalogue.py /path/to/assets /path/to/my_assets.db --watch --update
 
 Examples (Windows):
   hython importassetcatalogue.py C:\Assets C:\Data\my_assets.db
@@ -610,7 +4208,8 @@ Note: Thumbnail generation and case-insensitive matching are enabled by default.
 
     parser.add_argument(
         'assets_dir',
-        help='Path to directory containing asset subdirectories'
+        nargs='+',
+        help='Path to directory containing asset subdirectories, several can be given to import them all in one run'
     )
 
     parser.add_argument(
@@ -636,6 +4235,209 @@ Note: Thumbnail generation and case-insensitive matching are enabled by default.
         help='Disable automatic thumbnail generation from USD files (enabled by default)'
     )
 
+    parser.add_argument(
+        '--thumbnail-workers',
+        type=int,
+        default=0,
+        metavar='N',
+        help='Render missing thumbnails on N child hython processes in parallel (default: 0, render in this process)'
+    )
+
+    parser.add_argument(
+        '--karma-threads',
+        type=int,
+        metavar='N',
+        help='Threads each thumbnail worker may use (default: number of cores / --thumbnail-workers)'
+    )
+
+    parser.add_argument(
+        '--thumbnail-engine',
+        choices=THUMBNAIL_ENGINES,
+        default=DEFAULT_THUMBNAIL_ENGINE,
+        help=f'How thumbnails are rendered: preview (Storm, fast), karma-fast (few samples, denoised), karma (full quality) or auto, which picks one per asset by its USD file size (default: {DEFAULT_THUMBNAIL_ENGINE})'
+    )
+
+    parser.add_argument(
+        '--thumbnail-time-budget',
+        type=float,
+        metavar='SECONDS',
+        help=f'Most seconds a thumbnail render may take. With --thumbnail-workers a worker that goes over is killed and the thumbnail skipped. Rendering in this process it is only passed to Karma as its time limit, so preview and auto need --thumbnail-workers (default: {DEFAULT_PREVIEW_TIME_BUDGET:g} for preview, no limit for karma)'
+    )
+
+    parser.add_argument(
+        '--thumbnail-cache',
+        type=str,
+        metavar='DIR',
+        help='Cache generated thumbnails in DIR and reuse them in later runs or other databases'
+    )
+
+    parser.add_argument(
+        '--thumbnail-cache-size',
+        type=float,
+        default=DEFAULT_THUMBNAIL_CACHE_SIZE_GB,
+        metavar='GB',
+        help=f'Size cap of the thumbnail cache, least recently used thumbnails are evicted past it (default: {DEFAULT_THUMBNAIL_CACHE_SIZE_GB})'
+    )
+
+    parser.add_argument(
+        '--thumbnail-cache-hash',
+        action='store_true',
+        help='Key the thumbnail cache on USD file contents instead of path and mtime (reads every file, but shares thumbnails between copies)'
+    )
+
+    parser.add_argument(
+        '--normalize-thumbnails',
+        action='store_true',
+        help='Downscale and recompress thumbnails before storing them so huge images do not bloat the database (needs Pillow)'
+    )
+
+    parser.add_argument(
+        '--thumbnail-max-edge',
+        type=int,
+        default=DEFAULT_THUMBNAIL_MAX_EDGE,
+        metavar='PIXELS',
+        help=f'Longest edge of normalised thumbnails (default: {DEFAULT_THUMBNAIL_MAX_EDGE})'
+    )
+
+    parser.add_argument(
+        '--thumbnail-format',
+        choices=['jpeg', 'webp'],
+        default='jpeg',
+        help='Format of normalised thumbnails (default: jpeg)'
+    )
+
+    parser.add_argument(
+        '--thumbnail-quality',
+        type=int,
+        default=DEFAULT_THUMBNAIL_QUALITY,
+        metavar='1-100',
+        help=f'Encoder quality of normalised thumbnails (default: {DEFAULT_THUMBNAIL_QUALITY})'
+    )
+
+    parser.add_argument(
+        '--normalize-workers',
+        type=int,
+        metavar='N',
+        help='Processes used to normalise thumbnails (default: number of cores)'
+    )
+
+    parser.add_argument(
+        '--usd-metadata',
+        action='store_true',
+        help='Store the default prim, up axis, meters per unit and variant sets of each USD file in its metadata, cached next to the database'
+    )
+
+    parser.add_argument(
+        '--usd-metadata-counts',
+        action='store_true',
+        help='With --usd-metadata, also store prim/mesh/face counts. Loads every payload, so slow on heavy assets'
+    )
+
+    parser.add_argument(
+        '--usd-metadata-workers',
+        type=int,
+        metavar='N',
+        help='Processes used to read USD metadata (default: number of CPUs)'
+    )
+
+    parser.add_argument(
+        '--variant-sets',
+        action='store_true',
+        help='Also import every variant of the variant sets authored in an asset\'s primary USD file as a gallery variant, through small .usda layers written next to the database. Assets already in the database only get them with --update'
+    )
+
+    parser.add_argument(
+        '--dedupe',
+        choices=['link', 'skip'],
+        help='Hash the files being imported (cached next to the database) and handle files identical to an earlier one: link gives them its thumbnail instead of rendering another, skip leaves them out. Reports how much duplicated storage was found'
+    )
+
+    parser.add_argument(
+        '--dedupe-workers',
+        type=int,
+        metavar='N',
+        help='Threads used to hash files for --dedupe (default: --scan-workers)'
+    )
+
+    parser.add_argument(
+        '--commit-every',
+        type=int,
+        metavar='N',
+        help='Commit after every N assets instead of once at the end, so a failure only loses the current batch'
+    )
+
+    parser.add_argument(
+        '--commit-interval',
+        type=float,
+        metavar='SECONDS',
+        help='Commit whenever SECONDS have passed since the last commit'
+    )
+
+    parser.add_argument(
+        '--no-resume',
+        action='store_true',
+        help='Start over instead of resuming an interrupted batched import from its checkpoint'
+    )
+
+    parser.add_argument(
+        '--update',
+        action='store_true',
+        help='Refresh the thumbnail and metadata of assets already in the database whose files changed (size/mtime), instead of skipping them'
+    )
+
+    parser.add_argument(
+        '--update-hash',
+        action='store_true',
+        help='With --update, also compare file contents so files that were only touched are left alone (reads every changed file)'
+    )
+
+    parser.add_argument(
+        '--shard',
+        type=parse_shard,
+        metavar='i/N',
+        help='Only import shard i (0 to N-1) of N, picked by a stable hash of each asset path, so N machines can each build a partial database to combine with the merge command'
+    )
+
+    parser.add_argument(
+        '--prune',
+        action='store_true',
+        help='After importing, remove items under assets_dir whose files no longer exist'
+    )
+
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Scan and report what would be imported (and removed, with --prune) without touching the database. Runs under plain python, hou is not needed'
+    )
+
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='After importing, keep running and import asset directories as they change (inotify on Linux, polling elsewhere)'
+    )
+
+    parser.add_argument(
+        '--watch-debounce',
+        type=float,
+        default=DEFAULT_WATCH_DEBOUNCE,
+        metavar='SECONDS',
+        help=f'With --watch, import a batch once no changes have been seen for SECONDS (default: {DEFAULT_WATCH_DEBOUNCE:g})'
+    )
+
+    parser.add_argument(
+        '--report',
+        type=str,
+        metavar='PATH',
+        help='Where to write the JSON report of per-stage timings and the slowest assets (default: <database_path>.report.json)'
+    )
+
+    parser.add_argument(
+        '--prometheus-textfile',
+        type=str,
+        metavar='PATH',
+        help='Also write the timings as a Prometheus textfile, e.g. into the node exporter textfile collector directory'
+    )
+
     parser.add_argument(
         '--tags',
         type=str,
@@ -643,21 +4445,200 @@ Note: Thumbnail generation and case-insensitive matching are enabled by default.
         help='Comma-separated list of tags to apply to imported assets'
     )
 
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Skip asset directories that have not changed since the last incremental run, using a scan manifest next to the database'
+    )
+
+    parser.add_argument(
+        '--manifest',
+        type=str,
+        metavar='PATH',
+        help='Scan manifest used by --incremental (default: <database_path>.manifest.json)'
+    )
+
+    parser.add_argument(
+        '--recursive',
+        action='store_true',
+        help='Also look for asset directories inside category folders, down to --max-depth levels'
+    )
+
+    parser.add_argument(
+        '--max-depth',
+        type=int,
+        default=DEFAULT_MAX_DEPTH,
+        metavar='N',
+        help=f'With --recursive, how many levels down asset directories can be, 1 being direct subdirectories (default: {DEFAULT_MAX_DEPTH})'
+    )
+
+    parser.add_argument(
+        '--category-tags',
+        action='store_true',
+        help='With --recursive, tag each asset with the category folders above it, e.g. props and furniture'
+    )
+
+    parser.add_argument(
+        '--scan-workers',
+        type=int,
+        default=DEFAULT_SCAN_WORKERS,
+        metavar='N',
+        help=f'Number of threads used to scan asset directories (default: {DEFAULT_SCAN_WORKERS}, use 1 for serial scanning)'
+    )
+
     args = parser.parse_args()
 
+    if args.shard and (args.prune or args.watch):
+        parser.error('--shard can not be combined with --prune or --watch')
+
+    if args.recursive and args.watch:
+        parser.error('--recursive can not be combined with --watch, the watcher only sees direct subdirectories')
+
+    if args.max_depth < 1:
+        parser.error('--max-depth must be at least 1')
+
+    # Storm ignores Karma's time limit, so a preview budget is only kept by killing a render worker
+    # (a dry run renders nothing, the engine only picks the cache key)
+    if args.thumbnail_engine in ('preview', 'auto') and not args.no_generate_thumbnails and not args.dry_run and \
+            (not args.thumbnail_workers or args.watch):
+        parser.error(f'--thumbnail-engine {args.thumbnail_engine} needs --thumbnail-workers and can not be combined '
+                     'with --watch, its time budget is only enforced on render workers')
+
+    max_depth = args.max_depth if args.recursive else 1
+
     tags = None
     if args.tags:
         tags = [tag.strip() for tag in args.tags.split(',')]
 
+    if args.dry_run:
+        plan_import(
+            assets_dir=args.assets_dir,
+            database_path=args.database_path,
+            import_variants=not args.no_variants,
+            case_insensitive=not args.case_sensitive,
+            generate_thumbnails=not args.no_generate_thumbnails,
+            scan_workers=args.scan_workers,
+            incremental=args.incremental,
+            manifest_path=args.manifest,
+            thumbnail_cache_dir=args.thumbnail_cache,
+            thumbnail_cache_hash=args.thumbnail_cache_hash,
+            report_path=args.report,
+            shard=args.shard,
+            max_depth=max_depth,
+            thumbnail_engine=args.thumbnail_engine
+        )
+        if args.prune:
+            prune_assets(args.assets_dir, args.database_path, not args.case_sensitive, args.scan_workers, dry_run=True,
+                         max_depth=max_depth)
+        return
+
     import_assets(
         assets_dir=args.assets_dir,
         database_path=args.database_path,
         import_variants=not args.no_variants,
         case_insensitive=not args.case_sensitive,
         generate_thumbnails=not args.no_generate_thumbnails,
-        tags=tags
+        tags=tags,
+        scan_workers=args.scan_workers,
+        incremental=args.incremental,
+        manifest_path=args.manifest,
+        thumbnail_workers=args.thumbnail_workers,
+        karma_threads=args.karma_threads,
+        thumbnail_engine=args.thumbnail_engine,
+        thumbnail_time_budget=args.thumbnail_time_budget,
+        thumbnail_cache_dir=args.thumbnail_cache,
+        thumbnail_cache_size_gb=args.thumbnail_cache_size,
+        thumbnail_cache_hash=args.thumbnail_cache_hash,
+        commit_every=args.commit_every,
+        commit_interval=args.commit_interval,
+        resume=not args.no_resume,
+        update=args.update,
+        update_hash=args.update_hash,
+        normalize_thumbnails=args.normalize_thumbnails,
+        thumbnail_max_edge=args.thumbnail_max_edge,
+        thumbnail_format=args.thumbnail_format,
+        thumbnail_quality=args.thumbnail_quality,
+        normalize_workers=args.normalize_workers,
+        usd_metadata=args.usd_metadata,
+        usd_metadata_workers=args.usd_metadata_workers,
+        usd_metadata_counts=args.usd_metadata_counts,
+        variant_sets=args.variant_sets,
+        dedupe=args.dedupe,
+        dedupe_workers=args.dedupe_workers,
+        report_path=args.report,
+        prometheus_path=args.prometheus_textfile,
+        shard=args.shard,
+        max_depth=max_depth,
+        category_tags=args.category_tags
+    )
+
+    if args.prune:
+        prune_assets(args.assets_dir, args.database_path, not args.case_sensitive, args.scan_workers,
+                     max_depth=max_depth)
+
+    if args.watch:
+        watch_assets(
+            assets_dir=args.assets_dir,
+            database_path=args.database_path,
+            import_variants=not args.no_variants,
+            case_insensitive=not args.case_sensitive,
+            generate_thumbnails=not args.no_generate_thumbnails,
+            tags=tags,
+            thumbnail_cache_dir=args.thumbnail_cache,
+            thumbnail_cache_size_gb=args.thumbnail_cache_size,
+            thumbnail_cache_hash=args.thumbnail_cache_hash,
+            update=args.update,
+            update_hash=args.update_hash,
+            debounce=args.watch_debounce,
+            scan_workers=args.scan_workers,
+            normalize_thumbnails=args.normalize_thumbnails,
+            thumbnail_max_edge=args.thumbnail_max_edge,
+            thumbnail_format=args.thumbnail_format,
+            thumbnail_quality=args.thumbnail_quality,
+            normalize_workers=args.normalize_workers,
+            usd_metadata=args.usd_metadata,
+            usd_metadata_workers=args.usd_metadata_workers,
+            usd_metadata_counts=args.usd_metadata_counts,
+            variant_sets=args.variant_sets,
+            dedupe=args.dedupe,
+            dedupe_workers=args.dedupe_workers,
+            thumbnail_engine=args.thumbnail_engine,
+            thumbnail_time_budget=args.thumbnail_time_budget
+        )
+
+
+def merge_main():
+    """Command-line interface for merging shard databases, `importassetscatalogue.py merge ...`."""
+    parser = argparse.ArgumentParser(
+        prog=f"{os.path.basename(sys.argv[0])} {MERGE_COMMAND}",
+        description='Merge asset gallery databases built with --shard into one database',
+        epilog='''
+Examples:
+  hython importassetcatalogue.py merge /path/to/my_assets.db shard_0.db shard_1.db shard_2.db shard_3.db
+        ''',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument(
+        'database_path',
+        help='Path to the asset gallery database to merge into (created if missing)'
+    )
+
+    parser.add_argument(
+        'shard_paths',
+        nargs='+',
+        help='Paths to the shard databases'
     )
 
+    args = parser.parse_args(sys.argv[2:])
+
+    merge_databases(args.database_path, args.shard_paths)
+
 
 if __name__ == '__main__':
-    main()
+    if sys.argv[1:2] == [RENDER_WORKER_FLAG]:
+        render_worker_main()
+    elif sys.argv[1:2] == [MERGE_COMMAND]:
+        merge_main()
+    else:
+        main()